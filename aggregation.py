@@ -0,0 +1,137 @@
+import argparse
+import numpy as np
+
+from convergecast import GatheringTree
+from lifetime import EnergyModel
+from main import add_network_arguments, build_network
+
+def group_stats(readings, groups):
+    # Vectorized group-by over the columns of a (rounds, nodes) array: one stable sort of the group labels,
+    # then reduceat per statistic. Returns (group labels, {'min', 'max', 'mean', 'count'}), each statistic
+    # a (rounds, groups) array except count, which is the same every round.
+    if not len(groups):
+        empty = np.zeros((len(readings), 0))
+        return groups, {'min': empty, 'max': empty, 'mean': empty, 'count': np.zeros(0, dtype=np.int64)}
+    order = np.argsort(groups, kind='stable')
+    labels = groups[order]
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    columns = readings[:, order]
+    count = np.diff(np.r_[starts, len(labels)])
+    return labels[starts], {
+        'min': np.minimum.reduceat(columns, starts, axis=1),
+        'max': np.maximum.reduceat(columns, starts, axis=1),
+        'mean': np.add.reduceat(columns, starts, axis=1) / count,
+        'count': count,
+    }
+
+class AggregationReport:
+    def __init__(self, tree, heads, stats, raw, aggregated):
+        self.tree = tree
+        self.heads = heads  # Clusterhead node ID per aggregate column
+        self.stats = stats  # 'min'/'max'/'mean' -> (rounds, heads) arrays, 'count' -> readings merged per head
+        self.raw_messages, self.raw_energy = raw  # Per round, every reading forwarded to the sink on its own
+        self.messages, self.energy = aggregated  # Per round, with one aggregate packet per clusterhead
+
+    def summary(self):
+        saved = lambda before, after: (1 - after / before) * 100 if before else 0.0
+        return '\n'.join([
+            f"{len(self.heads)} clusterheads aggregate {int(self.stats['count'].sum())} readings per round",
+            f"Messages per round: {self.raw_messages} raw, {self.messages} aggregated "
+            f"({saved(self.raw_messages, self.messages):.1f}% saved)",
+            f"Energy per round: {self.raw_energy:.2f} raw, {self.energy:.2f} aggregated "
+            f"({saved(self.raw_energy, self.energy):.1f}% saved)",
+        ])
+
+def _edge_costs(wsn, tree, crossing, model):
+    # Messages and energy when crossing[u] packets go from u to its tree parent every round
+    # (as in lifetime.drain_rates, receiving at the mains-powered sink is free)
+    messages = energy = 0.0
+    for node_id, count in crossing.items():
+        if not count:
+            continue
+        parent_id = tree.parent[node_id]
+        cost = model.tx(wsn.node_map[node_id].distance_to(wsn.node_map[parent_id]))
+        if parent_id != tree.sink_id:
+            cost += model.rx()
+        messages += count
+        energy += count * cost
+    return int(messages), energy
+
+def _crossings(tree, packets):
+    # packets: (origin, terminal) pairs, terminal an ancestor of origin. A packet crosses the edge above u
+    # iff it starts inside u's subtree and ends above it, so the counts are subtree sums of +1 at origins
+    # and -1 at terminals, accumulated from the deepest nodes up.
+    delta = dict.fromkeys(tree.depth, 0)
+    for origin, terminal in packets:
+        delta[origin] += 1
+        delta[terminal] -= 1
+    for node_id in sorted(tree.parent, key=tree.depth.__getitem__, reverse=True):
+        delta[tree.parent[node_id]] += delta[node_id]
+    delta.pop(tree.sink_id)
+    return delta
+
+def simulate_aggregation(wsn, rounds=100, sink_id=None, model=None, readings=None, seed=None):
+    # Every node that can reach the sink takes one reading per round. A member's reading travels up the
+    # gathering tree to its clusterhead, which merges everything it collects into one min/max/mean/count packet
+    # for the sink. Readings whose head is not on their way to the sink, and readings from nodes without a
+    # head, go to the sink unmerged. readings, if given, is a (rounds, nodes) array in wsn.nodes order.
+    model = model or EnergyModel()
+    tree = GatheringTree(wsn, sink_id)
+    sink_id = tree.sink_id
+    if readings is None:
+        readings = np.random.default_rng(seed).normal(20.0, 5.0, (rounds, len(wsn.nodes)))
+
+    # Aggregation group of every reporting node: index of the head that merges its reading, or -1
+    head_index = {}
+    groups = np.full(len(wsn.nodes), -1, dtype=np.int64)
+    raw_packets = []
+    packets = []
+    for i, node in enumerate(wsn.nodes):
+        node_id = node.node_id
+        if node_id not in tree.depth:
+            continue
+        if node_id != sink_id:
+            raw_packets.append((node_id, sink_id))
+        head = node.cluster.clusterhead if node.cluster else None
+        terminal = sink_id
+        if head is not None and head.node_id in tree.depth and head.node_id != sink_id:
+            hop = node_id
+            while hop != sink_id and hop != head.node_id:
+                hop = tree.parent[hop]
+            if hop == head.node_id:
+                terminal = hop
+                if head.node_id not in head_index:
+                    head_index[head.node_id] = len(head_index)
+                    packets.append((head.node_id, sink_id))  # The aggregate itself
+                groups[i] = head_index[head.node_id]
+        if node_id != terminal and node_id != sink_id:
+            packets.append((node_id, terminal))
+
+    merged = np.flatnonzero(groups >= 0)
+    labels, stats = group_stats(readings[:, merged], groups[merged])
+    heads = list(head_index)
+    heads = [heads[label] for label in labels.tolist()]
+    raw = _edge_costs(wsn, tree, _crossings(tree, raw_packets), model)
+    aggregated = _edge_costs(wsn, tree, _crossings(tree, packets), model)
+    return AggregationReport(tree, heads, stats, raw, aggregated)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate in-network aggregation at clusterheads")
+    add_network_arguments(parser)
+    parser.add_argument('--sink', type=int, default=None, help="sink node ID (default: node nearest the centre)")
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    if not wsn.nodes:
+        print("No nodes in the network.")
+        return
+    report = simulate_aggregation(wsn, args.rounds, args.sink, seed=args.seed)
+    print(report.summary())
+    if args.rounds:
+        for head, mean in zip(report.heads, report.stats['mean'][-1].tolist()):
+            print(f"  Head {head}: mean reading {mean:.2f} in the last round")
+
+if __name__ == "__main__":
+    main()
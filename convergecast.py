@@ -0,0 +1,120 @@
+import argparse
+from collections import deque
+
+from lifetime import default_sink
+from main import add_network_arguments, build_network
+
+class GatheringTree:
+    # Tree every node's periodic report follows to the sink. It is built from one BFS from the sink over the
+    # reverse links (hops[v] = fewest hops from v to the sink). Members hand their report to their clusterhead
+    # when they can reach it in one hop and it is no further from the sink; clusterheads and every other node
+    # forward along the BFS backbone. Hop counts never increase towards the parent, and only clusterheads keep
+    # the same count, so the result is always a tree.
+    def __init__(self, wsn, sink_id=None, via_clusterhead=True):
+        if wsn.in_neighbors is None:
+            wsn.build_adjacency()
+        if sink_id is None:
+            sink_id = default_sink(wsn)
+        elif sink_id not in wsn.node_map:
+            raise ValueError(f"Sink node {sink_id} not found in the network")
+        self.sink_id = sink_id
+
+        hops = {sink_id: 0}
+        backbone = {}
+        queue = deque([sink_id])
+        while queue:
+            node_id = queue.popleft()
+            for other in wsn.in_neighbors[node_id]:
+                if other.node_id not in hops:
+                    hops[other.node_id] = hops[node_id] + 1
+                    backbone[other.node_id] = node_id
+                    queue.append(other.node_id)
+        self.hops = hops
+
+        parent = {}
+        for node_id, next_id in backbone.items():
+            node = wsn.node_map[node_id]
+            head = node.cluster.clusterhead if via_clusterhead and node.cluster else None
+            if (head is not None and head is not node and head.node_id in hops
+                    and hops[head.node_id] <= hops[node_id] and head in wsn.out_neighbors[node_id]):
+                next_id = head.node_id
+            parent[node_id] = next_id
+        self.parent = parent  # node_id -> next node towards the sink; the sink and unreachable nodes are absent
+        self.unreachable = [node.node_id for node in wsn.nodes if node.node_id not in hops]
+
+        # Depth and subtree sizes in one pass: parents come before children in DFS preorder
+        children = {}
+        for node_id, parent_id in parent.items():
+            children.setdefault(parent_id, []).append(node_id)
+        order = []
+        depth = {sink_id: 0}
+        stack = [sink_id]
+        while stack:
+            node_id = stack.pop()
+            order.append(node_id)
+            for child in children.get(node_id, ()):
+                depth[child] = depth[node_id] + 1
+                stack.append(child)
+        subtree = dict.fromkeys(order, 1)
+        for node_id in reversed(order):
+            if node_id != sink_id:
+                subtree[parent[node_id]] += subtree[node_id]
+        self.children = children
+        self.depth = depth  # Tree hops from each node to the sink
+        self.subtree = subtree  # Reports passing through each node per round, its own included
+
+    @property
+    def max_depth(self):
+        return max(self.depth.values())
+
+    @property
+    def messages(self):
+        # Transmissions per round: each report is sent once per tree hop
+        return sum(self.depth.values())
+
+    def load(self):
+        # Per node and round: (reports transmitted, reports received). The sink only receives.
+        return {node_id: (0 if node_id == self.sink_id else count, count - 1)
+                for node_id, count in self.subtree.items()}
+
+    def path(self, node_id):
+        # Node IDs from node_id to the sink along the tree, or None if it cannot reach the sink
+        if node_id not in self.depth:
+            return None
+        path = [node_id]
+        while path[-1] != self.sink_id:
+            path.append(self.parent[path[-1]])
+        return path
+
+    def summary(self, top=10):
+        reporting = len(self.depth) - 1
+        lines = [f"Sink: node {self.sink_id}, {reporting} reporting nodes, {len(self.unreachable)} cannot reach it"]
+        if reporting:
+            lines.append(f"Tree depth: max {self.max_depth}, mean {sum(self.depth.values()) / reporting:.2f} hops")
+        lines.append(f"Messages per round: {self.messages}")
+        busiest = sorted(((sent, node_id) for node_id, (sent, _) in self.load().items() if sent > 1), reverse=True)
+        if busiest:
+            lines.append("Busiest relays (reports sent per round):")
+            for sent, node_id in busiest[:top]:
+                lines.append(f"  Node {node_id}: {sent}")
+        if self.unreachable:
+            lines.append(f"Unreachable: {', '.join(str(node_id) for node_id in self.unreachable)}")
+        return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a convergecast gathering tree to a sink")
+    add_network_arguments(parser)
+    parser.add_argument('--sink', type=int, default=None, help="sink node ID (default: node nearest the centre)")
+    parser.add_argument('--direct', action='store_true', help="ignore clusterheads, use the hop-count backbone only")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    if not wsn.nodes:
+        print("No nodes in the network.")
+        return
+    tree = GatheringTree(wsn, args.sink, not args.direct)
+    print(tree.summary(args.top))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import numpy as np
+
+from main import add_network_arguments, build_network
+
+class Hole:
+    def __init__(self, area, x_min, y_min, x_max, y_max, cx, cy):
+        self.area = area  # Uncovered area in field units squared
+        self.bounds = (x_min, y_min, x_max, y_max)
+        self.centroid = (cx, cy)
+
+    def __repr__(self):
+        return (f"Hole(area={self.area:.2f}, centroid=({self.centroid[0]:.2f}, {self.centroid[1]:.2f}), "
+                f"bounds=({', '.join(f'{v:.2f}' for v in self.bounds)}))")
+
+class CoverageMap:
+    # Number of sensing disks covering each raster cell; counts[row, col] is the cell at
+    # x in [col, col + 1) / resolution, y in [row, row + 1) / resolution
+    def __init__(self, counts, resolution, width, height):
+        self.counts = counts
+        self.resolution = resolution
+        self.width = width
+        self.height = height
+
+    def coverage(self, k=1):
+        # Fraction of the field covered by at least k sensing disks
+        if self.counts.size == 0:
+            return 0.0
+        return float(np.count_nonzero(self.counts >= k)) / self.counts.size
+
+    def k_coverage(self, max_k=3):
+        return {k: self.coverage(k) for k in range(1, max_k + 1)}
+
+    def holes(self, min_area=0.0):
+        # Connected (4-neighbour) uncovered regions, largest first. Labelling works on horizontal runs
+        # of uncovered cells with a union-find, so the Python loop is per run rather than per cell.
+        uncovered = self.counts == 0
+        rows, cols = uncovered.shape
+        if not uncovered.any():
+            return []
+
+        padded = np.zeros((rows, cols + 2), dtype=np.int8)
+        padded[:, 1:-1] = uncovered
+        edges = np.diff(padded, axis=1)
+        run_rows, run_starts = np.nonzero(edges == 1)
+        _, run_ends = np.nonzero(edges == -1)  # Exclusive; row-major order matches the starts
+
+        parent = list(range(len(run_rows)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Runs in row r can only touch runs in row r - 1; walk both sorted run lists together
+        row_first = np.searchsorted(run_rows, np.arange(rows + 1))
+        for row in range(1, rows):
+            i, i_end = row_first[row - 1], row_first[row]
+            j, j_end = row_first[row], row_first[row + 1]
+            while i < i_end and j < j_end:
+                if run_starts[i] < run_ends[j] and run_starts[j] < run_ends[i]:
+                    a, b = find(i), find(j)
+                    if a != b:
+                        parent[b] = a
+                if run_ends[i] < run_ends[j]:
+                    i += 1
+                else:
+                    j += 1
+
+        labels = np.fromiter((find(i) for i in range(len(parent))), dtype=np.int64, count=len(parent))
+        lengths = run_ends - run_starts
+        _, groups = np.unique(labels, return_inverse=True)
+        n_groups = groups.max() + 1
+        cell_area = 1.0 / self.resolution ** 2
+        area = np.bincount(groups, weights=lengths, minlength=n_groups) * cell_area
+        # Run centroid sums: every cell centre in the run contributes (col + 0.5, row + 0.5)
+        sum_x = np.bincount(groups, weights=lengths * (run_starts + run_ends) / 2, minlength=n_groups)
+        sum_y = np.bincount(groups, weights=lengths * (run_rows + 0.5), minlength=n_groups)
+        x_min = np.full(n_groups, np.inf)
+        y_min = np.full(n_groups, np.inf)
+        x_max = np.zeros(n_groups)
+        y_max = np.zeros(n_groups)
+        np.minimum.at(x_min, groups, run_starts)
+        np.minimum.at(y_min, groups, run_rows)
+        np.maximum.at(x_max, groups, run_ends)
+        np.maximum.at(y_max, groups, run_rows + 1)
+
+        cells = area / cell_area
+        res = self.resolution
+        holes = [Hole(area[g], x_min[g] / res, y_min[g] / res, x_max[g] / res, y_max[g] / res,
+                      sum_x[g] / cells[g] / res, sum_y[g] / cells[g] / res)
+                 for g in range(n_groups) if area[g] >= min_area]
+        holes.sort(key=lambda hole: hole.area, reverse=True)
+        return holes
+
+    def summary(self, max_k=3, max_holes=5):
+        lines = [f"Coverage: {self.coverage() * 100:.2f}% of {self.width} x {self.height} "
+                 f"({self.counts.shape[1]} x {self.counts.shape[0]} cells)"]
+        lines.append("k-coverage: " + ', '.join(f"k>={k}: {fraction * 100:.2f}%"
+                                                for k, fraction in self.k_coverage(max_k).items()))
+        holes = self.holes()
+        lines.append(f"Holes: {len(holes)}")
+        for hole in holes[:max_holes]:
+            lines.append(f"  {hole}")
+        return '\n'.join(lines)
+
+def compute_coverage(wsn, resolution=10, sensing_range=None, sensing_ratio=1.0):
+    # Rasterize every node's sensing disk onto a grid with `resolution` cells per field unit. The disk
+    # radius is sensing_range if given, otherwise the node's radio range scaled by sensing_ratio.
+    cols = int(np.ceil(wsn.width * resolution))
+    rows = int(np.ceil(wsn.height * resolution))
+    counts = np.zeros((rows, cols), dtype=np.uint16)
+    n = len(wsn.nodes)
+    if n == 0:
+        return CoverageMap(counts, resolution, wsn.width, wsn.height)
+
+    x = np.fromiter((node.x for node in wsn.nodes), dtype=np.float64, count=n) * resolution
+    y = np.fromiter((node.y for node in wsn.nodes), dtype=np.float64, count=n) * resolution
+    if sensing_range is not None:
+        radius = np.full(n, float(sensing_range) * resolution)
+    else:
+        radius = np.fromiter((node.r for node in wsn.nodes), dtype=np.float64, count=n) * sensing_ratio * resolution
+
+    # Cell index bounds of each disk's bounding box, clipped to the raster
+    col_lo = np.clip(np.floor(x - radius), 0, cols).astype(np.int64)
+    col_hi = np.clip(np.ceil(x + radius) + 1, 0, cols).astype(np.int64)
+    row_lo = np.clip(np.floor(y - radius), 0, rows).astype(np.int64)
+    row_hi = np.clip(np.ceil(y + radius) + 1, 0, rows).astype(np.int64)
+    centres = np.arange(max(rows, cols)) + 0.5
+
+    # One vectorized stamp per node over its bounding box only
+    for i in range(n):
+        if col_lo[i] >= col_hi[i] or row_lo[i] >= row_hi[i]:
+            continue
+        dx2 = (centres[col_lo[i]:col_hi[i]] - x[i]) ** 2
+        dy2 = (centres[row_lo[i]:row_hi[i]] - y[i]) ** 2
+        inside = dy2[:, None] + dx2[None, :] <= radius[i] ** 2
+        counts[row_lo[i]:row_hi[i], col_lo[i]:col_hi[i]] += inside
+    return CoverageMap(counts, resolution, wsn.width, wsn.height)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterize sensing disks and report field coverage")
+    add_network_arguments(parser)
+    parser.add_argument('--resolution', type=float, default=10, help="raster cells per field unit")
+    parser.add_argument('--sensing-range', type=float, default=None, help="fixed sensing radius for all nodes")
+    parser.add_argument('--sensing-ratio', type=float, default=1.0, help="sensing radius as a fraction of r")
+    parser.add_argument('--max-k', type=int, default=3)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    coverage = compute_coverage(wsn, args.resolution, args.sensing_range, args.sensing_ratio)
+    print(coverage.summary(args.max_k))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import csv
+import random
+
+from main import add_network_arguments, build_network
+
+def node_columns(wsn):
+    # Per-node attributes with cluster membership, one list per column
+    head_ids = set(c.clusterhead.node_id for c in wsn.clusters if c.clusterhead)
+    nodes = wsn.nodes
+    return {
+        'node_id': [n.node_id for n in nodes],
+        'x': [n.x for n in nodes],
+        'y': [n.y for n in nodes],
+        'r': [n.r for n in nodes],
+        'e': [n.e for n in nodes],
+        'p': [n.p for n in nodes],
+        'f': [n.calculate_f() for n in nodes],
+        'cluster_id': [n.cluster.cluster_id if n.cluster else -1 for n in nodes],
+        'is_clusterhead': [n.node_id in head_ids for n in nodes],
+    }
+
+def cluster_columns(wsn):
+    # One row per cluster, including empty ones so cluster IDs index the rows directly
+    clusters = wsn.clusters
+    return {
+        'cluster_id': [c.cluster_id for c in clusters],
+        'x': [c.x for c in clusters],
+        'y': [c.y for c in clusters],
+        'size': [c.size for c in clusters],
+        'node_count': [len(c.nodes) for c in clusters],
+        'clusterhead_id': [c.clusterhead.node_id if c.clusterhead else -1 for c in clusters],
+        'mean_e': [sum(n.e for n in c.nodes) / len(c.nodes) if c.nodes else 0.0 for c in clusters],
+        'min_e': [min(n.e for n in c.nodes) if c.nodes else 0.0 for c in clusters],
+        'max_f': [max(n.calculate_f() for n in c.nodes) if c.nodes else 0.0 for c in clusters],
+    }
+
+def route_columns(queries, results):
+    # Batch route results next to the (source_id, dest_id) queries that produced them
+    return {
+        'source': [q[0] for q in queries],
+        'dest': [q[1] for q in queries],
+        'status': [r.status.value for r in results],
+        'hops': [r.hops for r in results],
+        'distance': [r.distance for r in results],
+        'failed_at': [r.failed_at if r.failed_at is not None else -1 for r in results],
+        'path': [r.path for r in results],
+    }
+
+def write_csv(filename, columns):
+    # Write all rows in one writerows call; list cells (route paths) become space-separated IDs
+    names = list(columns)
+    values = [[' '.join(map(str, v)) for v in col] if col and isinstance(col[0], list) else col
+              for col in columns.values()]
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*values))
+
+def export_csv(prefix, wsn, queries=None, results=None):
+    # Writes <prefix>_nodes.csv, <prefix>_clusters.csv and, if routes are given, <prefix>_routes.csv
+    written = [f"{prefix}_nodes.csv", f"{prefix}_clusters.csv"]
+    write_csv(written[0], node_columns(wsn))
+    write_csv(written[1], cluster_columns(wsn))
+    if results is not None:
+        written.append(f"{prefix}_routes.csv")
+        write_csv(written[2], route_columns(queries, results))
+    return written
+
+def export_npz(filename, wsn, queries=None, results=None):
+    # All tables in one compressed .npz, keys prefixed with nodes_/clusters_/routes_.
+    # Variable-length route paths are stored flat as routes_path plus routes_path_indptr offsets.
+    import numpy as np
+
+    arrays = {}
+    for table, columns in (('nodes', node_columns(wsn)), ('clusters', cluster_columns(wsn))):
+        for name, values in columns.items():
+            arrays[f"{table}_{name}"] = np.asarray(values)
+    if results is not None:
+        columns = route_columns(queries, results)
+        paths = columns.pop('path')
+        for name, values in columns.items():
+            arrays[f"routes_{name}"] = np.asarray(values)
+        arrays['routes_path_indptr'] = np.concatenate(([0], np.cumsum([len(p) for p in paths]))).astype(np.int64)
+        arrays['routes_path'] = np.fromiter((i for p in paths for i in p), dtype=np.int64,
+                                            count=int(arrays['routes_path_indptr'][-1]))
+    np.savez_compressed(filename, **arrays)
+    return filename
+
+def main():
+    parser = argparse.ArgumentParser(description="Export nodes, clusters and routes in columnar formats")
+    add_network_arguments(parser)
+    parser.add_argument('--prefix', default='network')
+    parser.add_argument('--format', choices=('csv', 'npz', 'both'), default='both')
+    parser.add_argument('--routes', type=int, default=0, help="also export this many random route queries")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+
+    queries = results = None
+    if args.routes and wsn.nodes:
+        rng = random.Random(args.seed)
+        ids = list(wsn.node_map)
+        queries = [(rng.choice(ids), rng.choice(ids)) for _ in range(args.routes)]
+        results = [wsn.route(source_id, dest_id) for source_id, dest_id in queries]
+
+    written = []
+    if args.format in ('csv', 'both'):
+        written += export_csv(args.prefix, wsn, queries, results)
+    if args.format in ('npz', 'both'):
+        written.append(export_npz(f"{args.prefix}.npz", wsn, queries, results))
+    print("Written: " + ', '.join(written))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import random
+
+from main import WSN, RouteResult, RouteStatus, add_network_arguments, build_network
+
+class SuperCluster:
+    # A group x group block of units from the level below, with its own elected head
+    def __init__(self, level, ix, iy, x, y, size):
+        self.level = level
+        self.key = (ix, iy)
+        self.x = x
+        self.y = y
+        self.size = size
+        self.children = []  # Units one level down: Cluster objects at level 1, SuperClusters above
+        self.head = None
+        self.parent = None
+
+    def elect_head(self):
+        # Same rule as Cluster.elect_clusterhead, over the heads of the child units
+        candidates = [child_head(child) for child in self.children]
+        candidates = [n for n in candidates if n is not None]
+        if not candidates:
+            self.head = None
+            return None
+        best = max(n.calculate_f() for n in candidates)
+        candidates = [n for n in candidates if n.calculate_f() == best]
+        cx = self.x + self.size / 2
+        cy = self.y + self.size / 2
+        self.head = min(candidates, key=lambda n: (n.x - cx) ** 2 + (n.y - cy) ** 2)
+        return self.head
+
+def child_head(unit):
+    return unit.clusterhead if hasattr(unit, 'clusterhead') else unit.head
+
+class ClusterHierarchy:
+    # Groups the WSN's cells into super-clusters of group x group units per level, until one unit covers the
+    # field (or `levels` levels exist). Level 0 is wsn.clusters; only occupied units are stored, so the state
+    # at each level is proportional to the number of non-empty units, not to the field area.
+    def __init__(self, wsn, group=4, levels=None):
+        self.wsn = wsn
+        self.group = group
+        self.max_levels = levels
+        self.build()
+
+    def build(self):
+        self.levels = []  # levels[k - 1] = {(ix, iy): SuperCluster} for k >= 1
+        self._parent = {}  # cluster_id -> level-1 SuperCluster
+        group = self.group
+        base = self.wsn.cluster_size
+        columns = -(-self.wsn.width // base)
+        rows = -(-self.wsn.height // base)
+
+        # (unit, grid column, grid row) of the occupied units at the level being grouped
+        units = [(c, int(c.x // base), int(c.y // base)) for c in self.wsn.clusters if c.nodes]
+        level = 0
+        while (self.max_levels is None or level < self.max_levels) and max(columns, rows) > 1:
+            level += 1
+            columns = -(-columns // group)
+            rows = -(-rows // group)
+            size = base * group ** level
+            supers = {}
+            for unit, ix, iy in units:
+                key = (ix // group, iy // group)
+                parent = supers.get(key)
+                if parent is None:
+                    parent = supers[key] = SuperCluster(level, key[0], key[1], key[0] * size, key[1] * size, size)
+                parent.children.append(unit)
+                if level == 1:
+                    self._parent[unit.cluster_id] = parent
+                else:
+                    unit.parent = parent
+            self.levels.append(supers)
+            units = [(unit, unit.key[0], unit.key[1]) for unit in supers.values()]
+        self.elect_heads()
+
+    def elect_heads(self):
+        # Bottom-up election; call after clusterheads change
+        for supers in self.levels:
+            for unit in supers.values():
+                unit.elect_head()
+
+    def update(self, cluster):
+        # Re-elect only the ancestors of one cluster after its head or membership changed
+        unit = self._parent.get(cluster.cluster_id)
+        if unit is None and cluster.nodes and self.levels:
+            # A cell that was empty when the hierarchy was built; rebuild from scratch
+            self.build()
+            return
+        while unit is not None:
+            unit.elect_head()
+            unit = unit.parent
+
+    def ancestors(self, node):
+        # Units containing the node, from its cluster (level 0) up to the top level
+        chain = [node.cluster]
+        unit = self._parent.get(node.cluster.cluster_id) if node.cluster else None
+        while unit is not None:
+            chain.append(unit)
+            unit = unit.parent
+        return chain
+
+    def head_path(self, source_id, dest_id):
+        # Heads a packet visits: up from the source through the heads of its units below the lowest common
+        # level, across to the matching head on the destination side (the common unit's own head is not
+        # visited), then down to the destination
+        source = self.wsn.node_map.get(source_id)
+        dest = self.wsn.node_map.get(dest_id)
+        if source is None or dest is None or source.cluster is None or dest.cluster is None:
+            return None
+        up = self.ancestors(source)
+        down = self.ancestors(dest)
+        common = next((k for k, (a, b) in enumerate(zip(up, down)) if a is b), len(up))
+        hops = [source]
+        for unit in up[:common]:
+            hops.append(child_head(unit))
+        for unit in reversed(down[:common]):
+            hops.append(child_head(unit))
+        hops.append(dest)
+        # Collapse repeats (a node can head several levels) and missing heads
+        path = []
+        for node in hops:
+            if node is not None and (not path or path[-1] is not node):
+                path.append(node)
+        return path
+
+    def route(self, source_id, dest_id, symmetric=False):
+        # Hierarchical route: greedy legs between the heads from head_path, so long-distance traffic
+        # climbs to just below the lowest level whose unit holds both endpoints instead of crossing every cell
+        waypoints = self.head_path(source_id, dest_id)
+        if waypoints is None:
+            missing = source_id if source_id not in self.wsn.node_map else dest_id
+            return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=missing)
+        path = [waypoints[0].node_id]
+        distance = 0.0
+        for a, b in zip(waypoints, waypoints[1:]):
+            leg = self.wsn.route(a.node_id, b.node_id, symmetric)
+            if not leg:
+                return RouteResult(leg.status, path + leg.path[1:], distance + leg.distance, leg.failed_at)
+            path.extend(leg.path[1:])
+            distance += leg.distance
+        return RouteResult(RouteStatus.OK, path, distance)
+
+    def aggregate(self, values, level, op=sum):
+        # Reduce per-node values (node_id -> value) to one value per unit at the given level
+        # (0 = clusters). Returns {unit key: op(values)}, keyed by cluster_id at level 0.
+        groups = {}
+        for node_id, value in values.items():
+            node = self.wsn.node_map.get(node_id)
+            if node is None or node.cluster is None:
+                continue
+            chain = self.ancestors(node)
+            if level >= len(chain):
+                continue
+            unit = chain[level]
+            key = unit.cluster_id if level == 0 else unit.key
+            groups.setdefault(key, []).append(value)
+        return {key: op(group) for key, group in groups.items()}
+
+    def summary(self):
+        lines = [f"Level 0: {sum(1 for c in self.wsn.clusters if c.nodes)} occupied cells of {self.wsn.cluster_size} m"]
+        for supers in self.levels:
+            unit = next(iter(supers.values()), None)
+            if unit is None:
+                break
+            heads = sum(1 for s in supers.values() if s.head is not None)
+            lines.append(f"Level {unit.level}: {len(supers)} occupied super-clusters of {unit.size} m, {heads} heads")
+        return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a multi-level cluster hierarchy and route through it")
+    add_network_arguments(parser)
+    parser.add_argument('--generate', type=int, default=0, help="generate this many nodes instead of reading --input")
+    parser.add_argument('--group', type=int, default=4, help="cells per super-cluster side")
+    parser.add_argument('--levels', type=int, default=None)
+    parser.add_argument('--routes', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.generate:
+        from scenario import populate
+        wsn = WSN(args.width, args.height, args.cell)
+        populate(wsn, args.generate, seed=args.seed)
+        wsn.elect_clusterheads()
+    else:
+        wsn = build_network(args.input, args.width, args.height, args.cell)
+    hierarchy = ClusterHierarchy(wsn, args.group, args.levels)
+    print(hierarchy.summary())
+
+    if args.routes and len(wsn.nodes) > 1:
+        rng = random.Random(args.seed)
+        ids = list(wsn.node_map)
+        flat = hier = 0
+        for _ in range(args.routes):
+            source_id, dest_id = rng.sample(ids, 2)
+            flat += bool(wsn.route(source_id, dest_id))
+            hier += bool(hierarchy.route(source_id, dest_id))
+        print(f"Delivered out of {args.routes}: flat greedy {flat}, hierarchical {hier}")
+
+if __name__ == "__main__":
+    main()
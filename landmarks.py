@@ -0,0 +1,156 @@
+import argparse
+import math
+import random
+import time
+from array import array
+from collections import deque
+
+from main import add_network_arguments, build_network
+
+UNREACHABLE = 0xFFFF  # Hop counts are stored as unsigned 16-bit values; this one marks "no path"
+
+def select_landmarks(wsn, k=None, method='clusterheads', seed=None, symmetric=False):
+    # Landmark node IDs: the clusterheads (highest F first when k limits them), k random nodes, or k nodes
+    # picked farthest-first in hops (each new landmark is the node furthest from all landmarks so far)
+    if method == 'clusterheads':
+        heads = [c.clusterhead for c in wsn.clusters if c.clusterhead is not None]
+        heads.sort(key=lambda n: n.calculate_f(), reverse=True)
+        return [n.node_id for n in heads[:k]]
+    ids = list(wsn.node_map)
+    k = min(k or 8, len(ids))
+    rng = random.Random(seed)
+    if method == 'random':
+        return rng.sample(ids, k)
+    if method == 'farthest':
+        if wsn.out_neighbors is None:
+            wsn.build_adjacency()
+        chosen = [rng.choice(ids)] if ids else []
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        nearest = [UNREACHABLE] * len(ids)
+        while chosen and len(chosen) < k:
+            hops = _bfs(wsn, chosen[-1], index, wsn.sym_neighbors if symmetric else wsn.out_neighbors)
+            nearest = [min(a, b) for a, b in zip(nearest, hops)]
+            # Unreachable nodes count as furthest, so disconnected parts get a landmark too
+            far = max(range(len(ids)), key=lambda i: (nearest[i], -i))
+            if nearest[far] == 0:
+                break
+            chosen.append(ids[far])
+        return chosen
+    raise ValueError(f"Unknown landmark selection method {method!r}")
+
+def _bfs(wsn, root_id, index, adjacency):
+    hops = array('H', [UNREACHABLE]) * len(index)
+    hops[index[root_id]] = 0
+    queue = deque([root_id])
+    while queue:
+        node_id = queue.popleft()
+        nxt = hops[index[node_id]] + 1
+        for other in adjacency[node_id]:
+            i = index[other.node_id]
+            if hops[i] == UNREACHABLE:
+                hops[i] = nxt
+                queue.append(other.node_id)
+    return hops
+
+class HopOracle:
+    # Hop-distance bounds between any two nodes from K landmarks. One forward BFS (landmark -> v) and one
+    # reverse BFS (v -> landmark) per landmark fill compact uint16 arrays. Because links are directed, the
+    # triangle inequality gives
+    #   d(u, v) <= d(u, L) + d(L, v)                          (upper bound, via L)
+    #   d(u, v) >= max(d(L, v) - d(L, u), d(u, L) - d(v, L))  (lower bound)
+    # and each query scans the K landmarks once. Bounds are exact when u or v is a landmark.
+    def __init__(self, wsn, landmarks=None, symmetric=False):
+        if wsn.out_neighbors is None:
+            wsn.build_adjacency()
+        if landmarks is None:
+            landmarks = select_landmarks(wsn)
+        self.landmarks = list(landmarks)
+        self.index = {node.node_id: i for i, node in enumerate(wsn.nodes)}
+        forward = wsn.sym_neighbors if symmetric else wsn.out_neighbors
+        reverse = wsn.sym_neighbors if symmetric else wsn.in_neighbors
+        self.from_landmark = [_bfs(wsn, node_id, self.index, forward) for node_id in self.landmarks]
+        self.to_landmark = [_bfs(wsn, node_id, self.index, reverse) for node_id in self.landmarks]
+
+    def bounds(self, source_id, dest_id):
+        # (lower, upper) hop bounds; math.inf for upper when no landmark links them, for both when a
+        # landmark proves dest unreachable from source
+        u = self.index[source_id]
+        v = self.index[dest_id]
+        if u == v:
+            return 0, 0
+        lower = 1
+        upper = math.inf
+        for from_l, to_l in zip(self.from_landmark, self.to_landmark):
+            l_u, l_v = from_l[u], from_l[v]
+            u_l, v_l = to_l[u], to_l[v]
+            # L reaches u but not v, or v reaches L but u does not: no path from u to v at all
+            if (l_u != UNREACHABLE and l_v == UNREACHABLE) or (v_l != UNREACHABLE and u_l == UNREACHABLE):
+                return math.inf, math.inf
+            if u_l != UNREACHABLE and l_v != UNREACHABLE:
+                upper = min(upper, u_l + l_v)
+            if l_u != UNREACHABLE:
+                lower = max(lower, l_v - l_u)
+            if v_l != UNREACHABLE:
+                lower = max(lower, u_l - v_l)
+        return lower, upper
+
+    def estimate(self, source_id, dest_id):
+        # Single-number estimate: the upper bound when one exists, the lower bound otherwise
+        lower, upper = self.bounds(source_id, dest_id)
+        return upper if upper != math.inf else lower
+
+    @property
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in self.from_landmark + self.to_landmark)
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark-based hop-distance bounds")
+    add_network_arguments(parser)
+    parser.add_argument('--landmarks', type=int, default=None, help="number of landmarks (default: all clusterheads)")
+    parser.add_argument('--method', choices=['clusterheads', 'farthest', 'random'], default='clusterheads')
+    parser.add_argument('--queries', type=int, default=1000, help="random pairs checked against exact BFS")
+    parser.add_argument('--symmetric', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    if len(wsn.nodes) < 2:
+        print("Need at least two nodes.")
+        return
+    wsn.build_adjacency()
+
+    start = time.perf_counter()
+    landmarks = select_landmarks(wsn, args.landmarks, args.method, args.seed, args.symmetric)
+    oracle = HopOracle(wsn, landmarks, args.symmetric)
+    built = time.perf_counter() - start
+    print(f"{len(landmarks)} landmarks, {oracle.nbytes / 1024:.1f} KiB of distance arrays, built in {built * 1000:.1f} ms")
+
+    rng = random.Random(args.seed)
+    ids = list(wsn.node_map)
+    pairs = [tuple(rng.sample(ids, 2)) for _ in range(args.queries)]
+    start = time.perf_counter()
+    answers = [oracle.bounds(source_id, dest_id) for source_id, dest_id in pairs]
+    per_query = (time.perf_counter() - start) / max(len(pairs), 1)
+
+    # Compare with exact hop distances from one BFS per distinct source
+    adjacency = wsn.sym_neighbors if args.symmetric else wsn.out_neighbors
+    exact_from = {}
+    exact = tight = violations = 0
+    gap = 0.0
+    finite = 0
+    for (source_id, dest_id), (lower, upper) in zip(pairs, answers):
+        if source_id not in exact_from:
+            exact_from[source_id] = _bfs(wsn, source_id, oracle.index, adjacency)
+        true = exact_from[source_id][oracle.index[dest_id]]
+        true = math.inf if true == UNREACHABLE else true
+        violations += not (lower <= true <= upper)
+        exact += lower == upper
+        tight += lower == true or upper == true
+        if upper != math.inf and true != math.inf:
+            gap += upper - lower
+            finite += 1
+    print(f"{per_query * 1e6:.1f} us per query; {exact} of {len(pairs)} answers exact, "
+          f"{tight} with a tight bound, mean gap {gap / finite if finite else 0:.2f} hops, {violations} violations")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import argparse
+
+from main import add_network_arguments, build_network
+
+class EnergyModel:
+    # First-order radio model in the same units as Node.e: sending a packet over d metres costs
+    # e_elec + e_amp * d^2, receiving one costs e_elec, and sensing/idling costs e_idle per round
+    def __init__(self, e_elec=0.05, e_amp=0.001, e_idle=0.01):
+        self.e_elec = e_elec
+        self.e_amp = e_amp
+        self.e_idle = e_idle
+
+    def tx(self, distance):
+        return self.e_elec + self.e_amp * distance * distance
+
+    def rx(self):
+        return self.e_elec
+
+def default_sink(wsn):
+    # Node closest to the centre of the field
+    cx = wsn.width / 2
+    cy = wsn.height / 2
+    return min(wsn.nodes, key=lambda n: (n.x - cx) ** 2 + (n.y - cy) ** 2).node_id
+
+def report_paths(wsn, sink_id, via_clusterhead=True):
+    # Path (node IDs) each node's periodic report takes to the sink: to its clusterhead first, then on
+    # to the sink. Failed routes keep the hops taken before the failure. Returns (paths, delivered count).
+    paths = {}
+    delivered = 0
+    head_routes = {}
+    for node in wsn.nodes:
+        if node.node_id == sink_id:
+            continue
+        head = node.cluster.clusterhead if via_clusterhead and node.cluster else None
+        if head is None or head is node or head.node_id == sink_id:
+            result = wsn.route(node.node_id, sink_id)
+            path = result.path
+            ok = bool(result)
+        else:
+            first = wsn.route(node.node_id, head.node_id)
+            path = first.path
+            ok = bool(first)
+            if ok:
+                second = head_routes.get(head.node_id)
+                if second is None:
+                    second = head_routes[head.node_id] = wsn.route(head.node_id, sink_id)
+                path = path + second.path[1:]
+                ok = bool(second)
+        paths[node.node_id] = path
+        delivered += ok
+    return paths, delivered
+
+def drain_rates(wsn, paths, sink_id, model):
+    # Energy each node spends per reporting round, transmitting and receiving along every report path
+    rates = dict.fromkeys(wsn.node_map, model.e_idle)
+    rates[sink_id] = 0.0
+    node_map = wsn.node_map
+    rx = model.rx()
+    for path in paths.values():
+        for a, b in zip(path, path[1:]):
+            rates[a] += model.tx(node_map[a].distance_to(node_map[b]))
+            if b != sink_id:
+                rates[b] += rx
+    return rates
+
+class LifetimeReport:
+    def __init__(self, n_nodes, deaths, partition, initial_delivery, initial_rates):
+        self.n_nodes = n_nodes  # Battery-powered nodes (the sink is excluded)
+        self.deaths = deaths  # (round, node_id) in order of death
+        self.partition = partition  # Round a node that could initially reach the sink lost its path, or None
+        self.initial_delivery = initial_delivery  # Fraction of reports delivered in the first round
+        self.initial_rates = initial_rates  # node_id -> energy per round at the start
+
+    def death_round(self, fraction):
+        # Round by which at least `fraction` of the nodes have died, or None if it never happens
+        needed = max(1, -int(-fraction * self.n_nodes // 1))
+        return self.deaths[needed - 1][0] if len(self.deaths) >= needed else None
+
+    @property
+    def first_death(self):
+        return self.deaths[0] if self.deaths else None
+
+    def summary(self):
+        fmt = lambda value: f"{value:.1f}" if value is not None else "never"
+        lines = [f"Initial delivery ratio: {self.initial_delivery * 100:.1f}%"]
+        if self.first_death:
+            lines.append(f"First node death: round {self.first_death[0]:.1f} (node {self.first_death[1]})")
+        else:
+            lines.append("First node death: never")
+        lines.append(f"Half of the nodes dead: round {fmt(self.death_round(0.5))}")
+        lines.append(f"Last node death: round {fmt(self.death_round(1.0))}")
+        lines.append(f"Partition from sink: round {fmt(self.partition)}")
+        return '\n'.join(lines)
+
+def _partitioned(wsn, sink_id, reachable):
+    # Partitioned once a surviving node that could reach the sink at the start no longer can,
+    # or once none of those nodes is left (immediately if the sink was unreachable to begin with)
+    survivors = [node_id for node_id in reachable if node_id in wsn.node_map]
+    still = set(n.node_id for n in wsn.upstream(sink_id))
+    return not survivors or any(node_id not in still for node_id in survivors)
+
+def _prepare(wsn, sink_id):
+    wsn = wsn.copy()
+    if wsn.out_neighbors is None:
+        wsn.build_adjacency()
+    if sink_id is None:
+        sink_id = default_sink(wsn)
+    elif sink_id not in wsn.node_map:
+        raise ValueError(f"Sink node {sink_id} not found in the network")
+    return wsn, sink_id
+
+def estimate_lifetime(wsn, sink_id=None, model=None, via_clusterhead=True, max_rounds=float('inf')):
+    # Every round each node sends one report to the sink (mains-powered, never dies). While no node dies
+    # the routes are fixed, so each node's energy falls linearly and the next death is found analytically
+    # as min(e / rate). The dead node is then removed (re-electing its cluster if it was the head), rates
+    # are recomputed and the process repeats, so the cost is one routing pass per death, not per round.
+    wsn, sink_id = _prepare(wsn, sink_id)
+    model = model or EnergyModel()
+
+    reachable = set(n.node_id for n in wsn.upstream(sink_id))
+    n_nodes = len(wsn.nodes) - 1
+    deaths = []
+    partition = None
+    time = 0.0
+    initial_delivery = None
+    initial_rates = None
+
+    while len(wsn.nodes) > 1:
+        paths, delivered = report_paths(wsn, sink_id, via_clusterhead)
+        rates = drain_rates(wsn, paths, sink_id, model)
+        if initial_rates is None:
+            initial_delivery = delivered / n_nodes if n_nodes else 0.0
+            initial_rates = rates
+
+        if partition is None and _partitioned(wsn, sink_id, reachable):
+            partition = time
+
+        candidates = [(node.e / rates[node.node_id], node.node_id) for node in wsn.nodes
+                      if node.node_id != sink_id and rates[node.node_id] > 0]
+        if not candidates:
+            break  # Nobody spends energy any more (no idle cost and no deliverable reports)
+        dt = min(candidates)[0]
+        if time + dt > max_rounds:
+            break
+        time += dt
+        for node in wsn.nodes:
+            node.e -= rates[node.node_id] * dt
+        # Remove every node that ran out in this step, in order of node ID for determinism
+        for node_id in sorted(node_id for remaining, node_id in candidates if remaining - dt <= 1e-9 * max(dt, 1)):
+            wsn.remove_node(node_id)
+            deaths.append((time, node_id))
+
+    if partition is None and len(wsn.nodes) == 1:
+        partition = time
+    return LifetimeReport(n_nodes, deaths, partition, initial_delivery or 0.0, initial_rates or {})
+
+def simulate_lifetime(wsn, policy, sink_id=None, model=None, via_clusterhead=True, max_rounds=10000):
+    # Round-by-round simulation for clusterhead policies that change heads every round (see rotation.py),
+    # where the piecewise-linear shortcut of estimate_lifetime does not apply. policy.elect(wsn) picks the
+    # heads at the start of each round; nodes whose energy reaches zero die at the end of the round.
+    wsn, sink_id = _prepare(wsn, sink_id)
+    model = model or EnergyModel()
+
+    reachable = set(n.node_id for n in wsn.upstream(sink_id))
+    n_nodes = len(wsn.nodes) - 1
+    deaths = []
+    partition = None if reachable else 0
+    initial_delivery = None
+    initial_rates = None
+
+    for round_no in range(1, max_rounds + 1):
+        if len(wsn.nodes) <= 1:
+            break
+        policy.elect(wsn)
+        paths, delivered = report_paths(wsn, sink_id, via_clusterhead)
+        rates = drain_rates(wsn, paths, sink_id, model)
+        if initial_rates is None:
+            initial_delivery = delivered / n_nodes if n_nodes else 0.0
+            initial_rates = rates
+
+        dead = []
+        for node in wsn.nodes:
+            node.e -= rates[node.node_id]
+            if node.e <= 0 and node.node_id != sink_id:
+                dead.append(node.node_id)
+        for node_id in dead:
+            wsn.remove_node(node_id)
+            deaths.append((round_no, node_id))
+        if dead and partition is None and _partitioned(wsn, sink_id, reachable):
+            partition = round_no
+
+    return LifetimeReport(n_nodes, deaths, partition, initial_delivery or 0.0, initial_rates or {})
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate network lifetime under periodic reporting to a sink")
+    add_network_arguments(parser)
+    parser.add_argument('--sink', type=int, default=None, help="sink node ID (default: node nearest the centre)")
+    parser.add_argument('--direct', action='store_true', help="route reports straight to the sink, not via clusterheads")
+    parser.add_argument('--e-elec', type=float, default=0.05)
+    parser.add_argument('--e-amp', type=float, default=0.001)
+    parser.add_argument('--e-idle', type=float, default=0.01)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    if len(wsn.nodes) < 2:
+        print("Need at least two nodes to estimate lifetime.")
+        return
+    report = estimate_lifetime(wsn, args.sink, EnergyModel(args.e_elec, args.e_amp, args.e_idle), not args.direct)
+    print(report.summary())
+
+if __name__ == "__main__":
+    main()
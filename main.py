@@ -1,14 +1,32 @@
 import random
 import math
+import os
+import sys
+import struct
+import time
+from array import array
+from bisect import insort
+from enum import Enum
+
+# Binary snapshot layout: header, then node columns, cluster members (CSR of node indexes, in member order),
+# clusterheads and (optionally)
+# the forward adjacency in CSR form. All values little-endian; bump the version on any layout change.
+SNAPSHOT_MAGIC = b'WSNS'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct('<4sH32sdddIIB')
+
+# User mode keeps the built network here and reuses it while input.txt and the field parameters are unchanged
+SNAPSHOT_CACHE = 'network.snapshot'
+
+LAUNCHED = time.perf_counter()  # Start of the time-to-first-query clock
+
+# add_nodes only imports NumPy for batches this large (importing it costs ~50 ms, about what vectorized
+# binning saves on 150k nodes); when another module has already imported it, every batch uses it
+VECTORIZE_MIN_NODES = 200000
 
 class Node:
-<<<<<<< HEAD
     def __init__(self, node_id, x, y, r, e, p):
         self.node_id = node_id
-=======
-    def __init__(self, id, x, y, r, e, p):
-        self.id = id
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
         self.x = x
         self.y = y
         self.r = r  # Radio range
@@ -17,7 +35,6 @@ class Node:
         self.cluster = None  # Initially, the node is not part of any cluster
 
     def calculate_f(self):
-<<<<<<< HEAD
         # F = 0.4 * R + 0.4 * E + 0.2 * P
         return 0.4 * self.r + 0.4 * self.e + 0.2 * self.p
 
@@ -25,31 +42,63 @@ class Node:
         # Calculate Euclidean distance to another node
         return math.sqrt((self.x - other_node.x)**2 + (self.y - other_node.y)**2)
 
+class RouteStatus(Enum):
+    OK = 'ok'
+    NO_NEIGHBORS = 'no-neighbors'
+    LOOP = 'loop'
+    UNKNOWN_NODE = 'unknown-node'
+    UNREACHABLE = 'unreachable'  # Shortest-path routers: no path to the destination exists
+
+class RouteResult:
+    # Outcome of a routing query; truthy only when the destination was reached
+    __slots__ = ('status', 'path', 'distance', 'failed_at', 'energy')
+
+    def __init__(self, status, path, distance=0.0, failed_at=None, energy=None):
+        self.status = status
+        self.path = path  # Node IDs visited, from the source up to the destination or the failure point
+        self.distance = distance  # Total Euclidean length of the hops taken
+        self.failed_at = failed_at  # Node ID where routing stopped, None on success
+        self.energy = energy  # Radio energy spent along the path, when the router computed it
+
+    @property
+    def hops(self):
+        return max(len(self.path) - 1, 0)
+
+    def __bool__(self):
+        return self.status is RouteStatus.OK
+
+    def __repr__(self):
+        return f"RouteResult({self.status.value}, path={self.path}, distance={self.distance:.2f})"
+
+    def describe(self):
+        # Human-readable diagnostics, only built when a caller actually wants to show them
+        if self.status is RouteStatus.OK:
+            return f"Route: {' -> '.join(str(node_id) for node_id in self.path)} ({self.hops} hops, {self.distance:.2f} m)"
+        if self.status is RouteStatus.UNKNOWN_NODE:
+            return f"Node {self.failed_at} not found in the network."
+        if self.status is RouteStatus.NO_NEIGHBORS:
+            return f"No neighbors found for node {self.failed_at} within radio range."
+        if self.status is RouteStatus.UNREACHABLE:
+            return f"Node {self.failed_at} cannot be reached from the source."
+        return f"Loop detected. Node {self.failed_at} is already in the path."
+
 class Cluster:
     def __init__(self, cluster_id, x, y, size):
         self.cluster_id = cluster_id
-=======
-        return 0.4 * self.r + 0.4 * self.e + 0.2 * self.p
-
-    def distance_to(self, other_node):
-        return math.sqrt((self.x - other_node.x)**2 + (self.y - other_node.y)**2)
-
-class Cluster:
-    def __init__(self, id, x, y, size):
-        self.id = id
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
         self.x = x
         self.y = y
         self.size = size
         self.nodes = []  # List to store nodes belonging to the cluster
         self.clusterhead = None  # Initially, no clusterhead is elected
+        self.version = 0  # Bumped on every membership change, so schedulers can cheaply detect them
 
     def add_node(self, node):
-<<<<<<< HEAD
-        # Add a node to the cluster and set its cluster reference
-        if node not in self.nodes:
+        # Add a node to the cluster and set its cluster reference. node.cluster always points at the
+        # cluster whose list holds the node, so it doubles as an O(1) duplicate check.
+        if node.cluster is not self:
             self.nodes.append(node)
             node.cluster = self
+            self.version += 1
 
     def elect_clusterhead(self):
         if not self.nodes:
@@ -76,124 +125,572 @@ class Cluster:
             self.clusterhead = candidates[0]
 
         return self.clusterhead
-=======
-        if node not in self.nodes:
-            self.nodes.append(node)  # Add the node to the cluster's node list
-            node.cluster = self  # Set the node's cluster reference to this cluster
-
-    def elect_clusterhead(self):
-        if not self.nodes:
-            return None  # Return None if there are no nodes in the cluster
-
-        max_f = float('-inf')  # Initialize max F value to negative infinity
-        candidates = []  # List to store candidate nodes for clusterhead
-
-        for node in self.nodes:
-            f = node.calculate_f()  # Calculate the F value for the node
-            if f > max_f:
-                max_f = f  # Update the max F value
-                candidates = [node]  # Reset candidates list with the new node
-            elif f == max_f:
-                candidates.append(node)  # Add node to candidates if F value is the same
-
-        if len(candidates) == 1:
-            self.clusterhead = candidates[0]  # Single candidate becomes clusterhead
-        else:
-            # Break tie based on proximity to cluster center
-            center_x = self.x + self.size / 2
-            center_y = self.y + self.size / 2
-            self.clusterhead = min(candidates, key=lambda n: (n.x - center_x)**2 + (n.y - center_y)**2)
-
-        return self.clusterhead  # Return the elected clusterhead
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
 
 class WSN:
     def __init__(self, width, height, cluster_size):
         self.width = width
         self.height = height
         self.cluster_size = cluster_size
-<<<<<<< HEAD
         self.nodes = []  # All nodes in the network
+        self.node_map = {}  # node_id -> Node, for constant-time lookups
         self.clusters = []  # All clusters in the network
+        # Adjacency indexes, built lazily by build_adjacency() and dropped whenever the topology changes
+        self.out_neighbors = None  # node_id -> nodes inside this node's radio range
+        self.in_neighbors = None  # node_id -> nodes whose radio range covers this node
+        self.sym_neighbors = None  # node_id -> nodes linked in both directions
+        self._order = {}  # node_id -> insertion sequence number, keeps neighbour lists in a stable order
+        self._next_order = 0
+        self.topology_version = 0  # Bumped whenever the adjacency indexes change, for caches derived from them
+        # Spatial grid behind the adjacency indexes (cell side = largest radio range), kept so that linking one
+        # node only scans the 3x3 cells around it; dropped together with the indexes
+        self._grid = None  # (cx, cy) -> nodes in that cell
+        self._grid_size = 1
+        self._grid_keys = {}  # node_id -> its cell, as of when it was linked
+        self.metrics = None  # Optional metrics.WSNMetrics that routing and election report to
         self._initialize_clusters()
-=======
-        self.nodes = []  # List to store all nodes in the network
-        self.clusters = []  # List to store all clusters in the network
-        self._initialize_clusters()  # Initialize clusters across the network area
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
 
     def _initialize_clusters(self):
+        # Row-major, matching cluster_index(): cluster_id = row * columns + column
         cluster_id = 0
-        for x in range(0, self.width, self.cluster_size):
-            for y in range(0, self.height, self.cluster_size):
+        for y in range(0, self.height, self.cluster_size):
+            for x in range(0, self.width, self.cluster_size):
                 self.clusters.append(Cluster(cluster_id, x, y, self.cluster_size))
                 cluster_id += 1
 
+    def cluster_index(self, x, y):
+        # Index of the cluster cell containing (x, y), or -1 outside the field
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        return int(y // self.cluster_size) * -(-self.width // self.cluster_size) + int(x // self.cluster_size)
+
     def add_node(self, node):
-<<<<<<< HEAD
         # Add the node and assign it to the correct cluster
-=======
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
         self.nodes.append(node)
-        cluster_x = int(node.x // self.cluster_size)
-        cluster_y = int(node.y // self.cluster_size)
-        cluster_index = cluster_y * (self.width // self.cluster_size) + cluster_x
-<<<<<<< HEAD
+        self.node_map[node.node_id] = node
+        self._order[node.node_id] = self._next_order
+        self._next_order += 1
+        if self.out_neighbors is not None:
+            self._link_node(node)
+        cluster_index = self.cluster_index(node.x, node.y)
         if 0 <= cluster_index < len(self.clusters):
             self.clusters[cluster_index].add_node(node)
         else:
             print(f"Error: Node {node.node_id} with coordinates ({node.x}, {node.y}) assigned to invalid cluster index {cluster_index}")
 
-    def elect_clusterheads(self):
-        # Elect clusterheads for each cluster
-=======
-        self.clusters[cluster_index].add_node(node)
+    def add_nodes(self, nodes):
+        # Bulk add_node: all cell indices are computed at once (vectorized when NumPy is already loaded or the
+        # batch is large, see VECTORIZE_MIN_NODES), the batch is grouped by cell with one stable sort, and
+        # each cluster's list is extended in one go.
+        # Built adjacency indexes are dropped and rebuilt lazily instead of being patched node by node.
+        if type(self).add_node is not WSN.add_node or type(self).cluster_index is not WSN.cluster_index:
+            for node in nodes:  # Layouts that re-cluster on insertion (e.g. quadtree.AdaptiveWSN)
+                self.add_node(node)
+            return
+        nodes = list(nodes)
+        if not nodes:
+            return
+        for node in nodes:
+            self.nodes.append(node)
+            self.node_map[node.node_id] = node
+            self._order[node.node_id] = self._next_order
+            self._next_order += 1
+        self.invalidate_adjacency()
 
-    def elect_clusterheads(self):
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
-        for cluster in self.clusters:
+        np = sys.modules.get('numpy')
+        if np is None and len(nodes) >= VECTORIZE_MIN_NODES:
+            try:
+                import numpy as np
+            except ImportError:
+                np = None
+        if np is not None:
+            x = np.fromiter((node.x for node in nodes), dtype=np.float64, count=len(nodes))
+            y = np.fromiter((node.y for node in nodes), dtype=np.float64, count=len(nodes))
+            columns = -(-self.width // self.cluster_size)
+            inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+            cells = np.where(inside, (y // self.cluster_size).astype(np.int64) * columns
+                             + (x // self.cluster_size).astype(np.int64), -1)
+            order = np.argsort(cells, kind='stable').tolist()
+            counts = np.bincount(cells + 1, minlength=len(self.clusters) + 1).tolist()
+        else:
+            cells = [self.cluster_index(node.x, node.y) for node in nodes]
+            order = sorted(range(len(nodes)), key=cells.__getitem__)
+            counts = [0] * (len(self.clusters) + 1)
+            for cell in cells:
+                counts[cell + 1] += 1
+
+        # counts[0] holds the nodes outside the field (cell -1), which sort first
+        for i in order[:counts[0]]:
+            node = nodes[i]
+            print(f"Error: Node {node.node_id} with coordinates ({node.x}, {node.y}) assigned to invalid cluster index -1")
+        start = counts[0]
+        for cluster, count in zip(self.clusters, counts[1:]):
+            if not count:
+                continue
+            members = [nodes[i] for i in order[start:start + count]]
+            start += count
+            added = 0
+            for node in members:
+                if node.cluster is not cluster:
+                    cluster.nodes.append(node)
+                    node.cluster = cluster
+                    added += 1
+            if added:
+                cluster.version += 1
+
+    def remove_node(self, node_id):
+        # Take a node out of the network (e.g. it failed), patching the adjacency indexes in place
+        node = self.node_map.pop(node_id, None)
+        if node is None:
+            return None
+        self.nodes.remove(node)
+        self._order.pop(node_id, None)
+        cluster = node.cluster
+        if cluster is not None:
+            self._leave_cluster(node)
+        if self.out_neighbors is not None:
+            self._unlink_node(node)
+        return node
+
+    def move_node(self, node_id, x, y, relink=True):
+        # Move a node, switching clusters only if it crossed a cell boundary and re-electing just the
+        # clusters involved. relink=False leaves the adjacency indexes to the caller (e.g. a bulk update
+        # that will call invalidate_adjacency() once).
+        node = self.node_map[node_id]
+        node.x = x
+        node.y = y
+        index = self.cluster_index(x, y)
+        new_cluster = self.clusters[index] if index >= 0 else None
+        if new_cluster is not node.cluster:
+            if node.cluster is not None:
+                self._leave_cluster(node)
+            if new_cluster is not None:
+                new_cluster.add_node(node)
+                new_cluster.elect_clusterhead()
+        if relink and self.out_neighbors is not None:
+            self._unlink_node(node)
+            self._link_node(node)
+        return node
+
+    def _leave_cluster(self, node):
+        cluster = node.cluster
+        cluster.nodes.remove(node)
+        cluster.version += 1
+        node.cluster = None
+        if cluster.clusterhead is node:
+            cluster.clusterhead = None
             cluster.elect_clusterhead()
 
-    def route(self, source_id, dest_id):
-<<<<<<< HEAD
-        source = next((node for node in self.nodes if node.node_id == source_id), None)
-        dest = next((node for node in self.nodes if node.node_id == dest_id), None)
-=======
-        source = next((node for node in self.nodes if node.id == source_id), None)
-        dest = next((node for node in self.nodes if node.id == dest_id), None)
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
-
-        if not source or not dest:
-            print(f"Source or destination node not found. Source ID: {source_id}, Destination ID: {dest_id}")
-            return None
+    def _build_grid(self):
+        # Bucket nodes into cells as wide as the largest radio range: every link then joins nodes in the same or
+        # adjacent cells, whichever node's range it comes from
+        size = max((node.r for node in self.nodes), default=1)
+        self._grid_size = size if size > 0 else 1
+        self._grid = {}
+        self._grid_keys = {}
+        for node in self.nodes:
+            self._grid_insert(node)
+        return self._grid
+
+    def _grid_insert(self, node):
+        key = (int(node.x // self._grid_size), int(node.y // self._grid_size))
+        self._grid.setdefault(key, []).append(node)
+        self._grid_keys[node.node_id] = key
+
+    def _unlink_node(self, node):
+        self.topology_version += 1
+        node_id = node.node_id
+        if self._grid is not None:
+            key = self._grid_keys.pop(node_id)  # The cell it was linked in; it may have moved since
+            bucket = self._grid[key]
+            bucket.remove(node)
+            if not bucket:
+                del self._grid[key]
+        for other in self.out_neighbors.pop(node_id):
+            self.in_neighbors[other.node_id].remove(node)
+        for other in self.in_neighbors.pop(node_id):
+            self.out_neighbors[other.node_id].remove(node)
+        for other in self.sym_neighbors.pop(node_id):
+            self.sym_neighbors[other.node_id].remove(node)
+
+    def _link_node(self, node):
+        # Add a node to already built indexes, comparing it only with the nodes in the 3x3 grid cells around
+        # it. Its own lists follow self.nodes order; it is inserted into other nodes' lists by insertion
+        # sequence so every list stays in a stable order.
+        self.topology_version += 1
+        if self._grid is None or node.r > self._grid_size:
+            self._build_grid()  # Also after a snapshot load, or when this node outranges the cells
+        else:
+            self._grid_insert(node)
+        out_list = self.out_neighbors[node.node_id] = []
+        in_list = self.in_neighbors[node.node_id] = []
+        sym_list = self.sym_neighbors[node.node_id] = []
+        key = lambda n: self._order[n.node_id]
+        cx, cy = self._grid_keys[node.node_id]
+        nearby = [other for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                  for other in self._grid.get((cx + dx, cy + dy), ()) if other is not node]
+        nearby.sort(key=key)
+        for other in nearby:
+            d = node.distance_to(other)
+            node_hears = d <= node.r
+            other_hears = d <= other.r
+            if node_hears:
+                out_list.append(other)
+                insort(self.in_neighbors[other.node_id], node, key=key)
+            if other_hears:
+                in_list.append(other)
+                insort(self.out_neighbors[other.node_id], node, key=key)
+            if node_hears and other_hears:
+                sym_list.append(other)
+                insort(self.sym_neighbors[other.node_id], node, key=key)
+
+    def copy(self):
+        # Independent copy with fresh Node objects, same clusterheads and (if built) adjacency,
+        # for analyses that drain energy or remove nodes without touching this network
+        wsn = self._blank()
+        for node in self.nodes:
+            wsn.add_node(Node(node.node_id, node.x, node.y, node.r, node.e, node.p))
+        head_ids = set(c.clusterhead.node_id for c in self.clusters if c.clusterhead is not None)
+        if head_ids:
+            for cluster in wsn.clusters:
+                heads = [n for n in cluster.nodes if n.node_id in head_ids]
+                if len(heads) == 1:
+                    cluster.clusterhead = heads[0]
+                elif cluster.nodes:
+                    cluster.elect_clusterhead()  # Layout differs (e.g. adaptive cells split in another order)
+        if self.out_neighbors is not None:
+            wsn.build_adjacency()
+        return wsn
+
+    def _blank(self):
+        # Empty network with the same field and clustering parameters; subclasses with other parameters override it
+        return WSN(self.width, self.height, self.cluster_size)
 
-        path = [source]
+    def elect_clusterheads(self):
+        # Elect clusterheads for each cluster
+        if self.metrics is None:
+            for cluster in self.clusters:
+                cluster.elect_clusterhead()
+            return
+        start = time.perf_counter()
+        previous = [cluster.clusterhead for cluster in self.clusters]
+        for cluster in self.clusters:
+            cluster.elect_clusterhead()
+        changed = sum(1 for cluster, head in zip(self.clusters, previous) if cluster.clusterhead is not head)
+        self.metrics.observe_election(self, changed, time.perf_counter() - start)
+
+    def invalidate_adjacency(self):
+        self._grid = None
+        self.out_neighbors = None
+        self.in_neighbors = None
+        self.sym_neighbors = None
+        self.topology_version += 1
+
+    def build_adjacency(self):
+        # Radio ranges differ per node, so links are directed: A -> B when B lies inside A's range.
+        # Every unordered pair is measured once and fills the forward, reverse and symmetric
+        # indexes together, so the reverse index costs no extra distance computations.
+        start = time.perf_counter()
+        out_neighbors = {node.node_id: [] for node in self.nodes}
+        in_neighbors = {node.node_id: [] for node in self.nodes}
+        sym_neighbors = {node.node_id: [] for node in self.nodes}
+
+        if self.nodes:
+            # Only pairs in the same or adjacent grid cells can possibly be linked
+            grid = self._build_grid()
+
+            # Visit each pair of cells once: the cell itself plus half of its neighbourhood
+            for (cx, cy), bucket in grid.items():
+                for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+                    other = grid.get((cx + dx, cy + dy))
+                    if other is None:
+                        continue
+                    for i, a in enumerate(bucket):
+                        for b in (bucket[i + 1:] if dx == 0 and dy == 0 else other):
+                            d = a.distance_to(b)
+                            a_hears = d <= a.r
+                            b_hears = d <= b.r
+                            if a_hears:
+                                out_neighbors[a.node_id].append(b)
+                                in_neighbors[b.node_id].append(a)
+                            if b_hears:
+                                out_neighbors[b.node_id].append(a)
+                                in_neighbors[a.node_id].append(b)
+                            if a_hears and b_hears:
+                                sym_neighbors[a.node_id].append(b)
+                                sym_neighbors[b.node_id].append(a)
+
+            # Keep neighbours in insertion order so greedy tie-breaks match a plain scan of self.nodes
+            order = self._order
+            key = lambda n: order[n.node_id]
+            for index in (out_neighbors, in_neighbors, sym_neighbors):
+                for neighbors in index.values():
+                    neighbors.sort(key=key)
+
+        self.out_neighbors = out_neighbors
+        self.in_neighbors = in_neighbors
+        self.sym_neighbors = sym_neighbors
+        self.topology_version += 1
+        if self.metrics is not None:
+            self.metrics.observe_adjacency(time.perf_counter() - start)
+
+    def neighbors(self, node_id, symmetric=False):
+        # Nodes reachable in one hop; with symmetric=True only links that can be acknowledged
+        if self.out_neighbors is None:
+            self.build_adjacency()
+        index = self.sym_neighbors if symmetric else self.out_neighbors
+        return index.get(node_id, [])
+
+    def upstream(self, node_id):
+        # Nodes that can reach node_id over one or more hops (e.g. "who can reach this sink?")
+        if self.in_neighbors is None:
+            self.build_adjacency()
+        return self._reachable(node_id, self.in_neighbors)
+
+    def downstream(self, node_id, symmetric=False):
+        # Nodes that node_id can reach over one or more hops
+        if self.out_neighbors is None:
+            self.build_adjacency()
+        return self._reachable(node_id, self.sym_neighbors if symmetric else self.out_neighbors)
+
+    def _reachable(self, node_id, index):
+        if node_id not in index:
+            return []
+        seen = {node_id}
+        frontier = [node_id]
+        found = []
+        while frontier:
+            next_frontier = []
+            for current_id in frontier:
+                for node in index[current_id]:
+                    if node.node_id not in seen:
+                        seen.add(node.node_id)
+                        found.append(node)
+                        next_frontier.append(node.node_id)
+            frontier = next_frontier
+        return found
+
+    def route(self, source_id, dest_id, symmetric=False):
+        if self.metrics is None:
+            return self._greedy_route(source_id, dest_id, symmetric)
+        start = time.perf_counter()
+        result = self._greedy_route(source_id, dest_id, symmetric)
+        self.metrics.observe_route('greedy', result, time.perf_counter() - start)
+        return result
+
+    def _greedy_route(self, source_id, dest_id, symmetric):
+        source = self.node_map.get(source_id)
+        dest = self.node_map.get(dest_id)
+
+        if source is None:
+            return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=source_id)
+        if dest is None:
+            return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=dest_id)
+
+        path = [source.node_id]
+        visited = {source.node_id}
+        distance = 0.0
         current = source
 
-        while current != dest:
-            neighbors = [node for node in self.nodes if node != current and current.distance_to(node) <= current.r]
+        while current is not dest:
+            neighbors = self.neighbors(current.node_id, symmetric)
             if not neighbors:
-<<<<<<< HEAD
-                print(f"No neighbors found for node {current.node_id} within radio range.")
-=======
-                print(f"No neighbors found for node {current.id} within radio range.")
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
-                return None  # No route found
+                return RouteResult(RouteStatus.NO_NEIGHBORS, path, distance, current.node_id)
 
             next_hop = min(neighbors, key=lambda n: n.distance_to(dest))
-            if next_hop in path:
-<<<<<<< HEAD
-                print(f"Loop detected. Node {next_hop.node_id} is already in the path.")
-=======
-                print(f"Loop detected. Node {next_hop.id} is already in the path.")
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
-                return None  # Prevent loops
-            path.append(next_hop)
+            if next_hop.node_id in visited:
+                return RouteResult(RouteStatus.LOOP, path, distance, next_hop.node_id)  # Prevent loops
+            distance += current.distance_to(next_hop)
+            path.append(next_hop.node_id)
+            visited.add(next_hop.node_id)
             current = next_hop
 
-        return path
+        return RouteResult(RouteStatus.OK, path, distance)
+
+    def save_snapshot(self, path, input_file=None):
+        # Persist the built network; input_file (if given) is hashed so load_snapshot can detect stale snapshots
+        digest = file_digest(input_file) if input_file else bytes(32)
+        has_adjacency = self.out_neighbors is not None
+        index = {node.node_id: i for i, node in enumerate(self.nodes)}
+
+        ids = array('q', (node.node_id for node in self.nodes))
+        columns = [array('d', (getattr(node, attr) for node in self.nodes)) for attr in ('x', 'y', 'r', 'e', 'p')]
+        # Members per cluster in their own order, which move_node/remove_node can make differ from self.nodes order
+        member_ptr = array('I', [0])
+        members = array('I')
+        for cluster in self.clusters:
+            members.extend(index[node.node_id] for node in cluster.nodes)
+            member_ptr.append(len(members))
+        heads = array('i', (index[c.clusterhead.node_id] if c.clusterhead else -1 for c in self.clusters))
+
+        with open(path, 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, digest,
+                                         self.width, self.height, self.cluster_size,
+                                         len(self.nodes), len(self.clusters), has_adjacency))
+            for values in [ids, *columns, member_ptr, members, heads]:
+                _write_array(f, values)
+            if has_adjacency:
+                # The reverse and symmetric indexes are derived from the forward one on load
+                indptr = array('I', [0])
+                indices = array('I')
+                for node in self.nodes:
+                    indices.extend(index[n.node_id] for n in self.out_neighbors[node.node_id])
+                    indptr.append(len(indices))
+                _write_array(f, indptr)
+                _write_array(f, indices)
+
+    @classmethod
+    def load_snapshot(cls, path, input_file=None):
+        # Returns None when input_file no longer matches the file the snapshot was built from
+        with open(path, 'rb') as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+            if len(header) < SNAPSHOT_HEADER.size:
+                raise ValueError(f"{path} is not a WSN snapshot")
+            magic, version, digest, width, height, cluster_size, n, n_clusters, has_adjacency = SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a WSN snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {version} in {path}")
+            if input_file and digest != file_digest(input_file):
+                return None
+
+            ids = _read_array(f, 'q', n)
+            x, y, r, e, p = (_read_array(f, 'd', n) for _ in range(5))
+            member_ptr = _read_array(f, 'I', n_clusters + 1)
+            _check_csr(member_ptr, path)
+            members = _read_array(f, 'I', member_ptr[-1])
+            heads = _read_array(f, 'i', n_clusters)
+            # Every index below is used to look up nodes, so a corrupt value must fail here as a ValueError
+            _check_indexes(members, n, "cluster member", path)
+            if len(set(members)) != len(members):
+                raise ValueError(f"Corrupt snapshot {path}: node in more than one cluster")
+            _check_indexes(heads, n, "clusterhead", path, allow_missing=True)
+
+            wsn = cls(_as_int(width), _as_int(height), _as_int(cluster_size))
+            if len(wsn.clusters) != n_clusters:
+                raise ValueError(f"Corrupt snapshot {path}: expected {len(wsn.clusters)} clusters, found {n_clusters}")
+            nodes = [Node(*values) for values in zip(ids, x, y, r, e, p)]
+            wsn.nodes = nodes
+            wsn.node_map = {node.node_id: node for node in nodes}
+            if len(wsn.node_map) != n:
+                raise ValueError(f"Corrupt snapshot {path}: duplicate node IDs")
+            wsn._order = {node.node_id: i for i, node in enumerate(nodes)}
+            wsn._next_order = len(nodes)
+            for i, cluster in enumerate(wsn.clusters):
+                cluster.nodes = [nodes[j] for j in members[member_ptr[i]:member_ptr[i + 1]]]
+                for node in cluster.nodes:
+                    node.cluster = cluster
+            for cluster, head in zip(wsn.clusters, heads):
+                cluster.clusterhead = nodes[head] if head >= 0 else None
+                if head >= 0 and nodes[head].cluster is not cluster:
+                    raise ValueError(f"Corrupt snapshot {path}: clusterhead outside its cluster")
+
+            if has_adjacency:
+                indptr = _read_array(f, 'I', n + 1)
+                _check_csr(indptr, path)
+                indices = _read_array(f, 'I', indptr[-1])
+                _check_indexes(indices, n, "neighbour", path)
+                wsn._restore_adjacency(indptr, indices)
+        return wsn
+
+    def _restore_adjacency(self, indptr, indices):
+        self._grid = None  # Built on the first incremental update
+        nodes = self.nodes
+        out_neighbors = {}
+        in_neighbors = {node.node_id: [] for node in nodes}
+        for i, node in enumerate(nodes):
+            targets = [nodes[j] for j in indices[indptr[i]:indptr[i + 1]]]
+            out_neighbors[node.node_id] = targets
+            # Sources are visited in insertion order, so each reverse list comes out already sorted
+            for target in targets:
+                in_neighbors[target.node_id].append(node)
+        sym_neighbors = {}
+        for node in nodes:
+            incoming = set(n.node_id for n in in_neighbors[node.node_id])
+            sym_neighbors[node.node_id] = [n for n in out_neighbors[node.node_id] if n.node_id in incoming]
+        self.out_neighbors = out_neighbors
+        self.in_neighbors = in_neighbors
+        self.sym_neighbors = sym_neighbors
+        self.topology_version += 1
+
+def file_digest(filename):
+    # SHA-256 of a file's bytes, used to key snapshots to the input they were built from
+    import hashlib  # Only snapshots need it; keeps it off the startup path
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.digest()
+
+def _write_array(f, values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    f.write(values.tobytes())
+
+def _read_array(f, typecode, count):
+    values = array(typecode)
+    size = values.itemsize * count
+    if size > os.fstat(f.fileno()).st_size - f.tell():  # A corrupt count must not turn into a huge read
+        raise ValueError("Truncated WSN snapshot")
+    values.frombytes(f.read(size))
+    if len(values) != count:
+        raise ValueError("Truncated WSN snapshot")
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def _check_indexes(values, limit, what, path, allow_missing=False):
+    # Node indexes must lie in [0, limit), or be -1 where allow_missing marks "none"
+    if values and (min(values) < (-1 if allow_missing else 0) or max(values) >= limit):
+        raise ValueError(f"Corrupt snapshot {path}: {what} index out of range")
+
+def _check_csr(indptr, path):
+    if indptr[0] != 0 or any(a > b for a, b in zip(indptr, indptr[1:])):
+        raise ValueError(f"Corrupt snapshot {path}: offsets are not increasing")
+
+def _as_int(value):
+    return int(value) if float(value).is_integer() else value
+
+def add_network_arguments(parser):
+    # --input and the field layout, shared by every command-line tool that builds a network from an input file
+    parser.add_argument('--input', default='input.txt')
+    parser.add_argument('--width', type=int, default=20, help="field width")
+    parser.add_argument('--height', type=int, default=20, help="field height")
+    parser.add_argument('--cell', type=int, default=5, help="cluster cell side")
+
+def build_network(input_file, width=20, height=20, cluster_size=5, metrics=None):
+    # Network read from an input file, clustered and with clusterheads elected
+    wsn = WSN(width, height, cluster_size)
+    wsn.metrics = metrics
+    wsn.add_nodes(read_nodes_from_file(input_file))
+    wsn.elect_clusterheads()
+    return wsn
+
+def load_or_build(input_file, snapshot_path, width=20, height=20, cluster_size=5, metrics=None):
+    # Reuse a snapshot when it was built from the same input and parameters, otherwise rebuild and save one.
+    # metrics (a metrics.WSNMetrics) records the cache hit or miss and is attached to the returned network.
+    try:
+        wsn = WSN.load_snapshot(snapshot_path, input_file)
+    except (OSError, ValueError):
+        wsn = None
+    hit = wsn is not None and (wsn.width, wsn.height, wsn.cluster_size) == (width, height, cluster_size)
+    if metrics is not None:
+        metrics.observe_cache('snapshot', hit)
+    if hit:
+        wsn.metrics = metrics
+        return wsn
+
+    wsn = build_network(input_file, width, height, cluster_size, metrics)
+    wsn.build_adjacency()
+    # The snapshot is only a cache: skip it when there is no input to key it to, and never let a failed
+    # write (e.g. a read-only directory) end the session
+    if os.path.isfile(input_file):
+        try:
+            wsn.save_snapshot(snapshot_path, input_file)
+        except OSError as e:
+            print(f"Could not save snapshot {snapshot_path}: {e}")
+    return wsn
 
-<<<<<<< HEAD
 def generate_random_node(node_id):
     return Node(
         node_id + 1,  # Start IDs from 1
@@ -202,16 +699,6 @@ def generate_random_node(node_id):
         random.randint(1, 8),
         random.randint(1, 100),
         random.randint(1, 100)
-=======
-def generate_random_node(id):
-    return Node(
-        id,
-        random.uniform(0, 20),
-        random.uniform(0, 20),
-        random.uniform(1, 8),
-        random.uniform(1, 100),
-        random.uniform(1, 100)
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
     )
 
 def read_nodes_from_file(filename):
@@ -221,17 +708,8 @@ def read_nodes_from_file(filename):
             n = int(f.readline().strip())
             for i in range(n):
                 line = f.readline().strip()
-<<<<<<< HEAD
                 x, y, r, e, p = map(float, line.split())
                 nodes.append(Node(i + 1, x, y, r, e, p))  # Start IDs from 1
-=======
-                try:
-                    x, y, r, e, p = map(float, line.split())
-                    nodes.append(Node(i, x, y, r, e, p))
-                except ValueError as ve:
-                    print(f"Error parsing line {i + 2}: {line}")
-                    print(f"ValueError: {ve}")
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
     except FileNotFoundError:
         print(f"File {filename} not found.")
     except Exception as e:
@@ -240,15 +718,11 @@ def read_nodes_from_file(filename):
 
 def write_network_to_file(filename, wsn):
     with open(filename, 'w') as f:
-<<<<<<< HEAD
         # Write node information
-=======
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
         f.write(f"{len(wsn.nodes)}\n")
         for node in wsn.nodes:
             f.write(f"{node.x:.2f} {node.y:.2f} {node.r:.2f} {node.e:.2f} {node.p:.2f}\n")
 
-<<<<<<< HEAD
         # Write cluster information
         f.write("\nCluster Information:\n")
         for cluster in wsn.clusters:
@@ -258,68 +732,45 @@ def write_network_to_file(filename, wsn):
                 f.write(f"  Clusterhead: {cluster.clusterhead.node_id if cluster.clusterhead else 'None'}\n")
 
 def main():
-=======
-        f.write("\nCluster Information:\n")
-        for cluster in wsn.clusters:
-            f.write(f"Cluster {cluster.id}:\n")
-            f.write(f"  Nodes: {', '.join(str(node.id) for node in cluster.nodes)}\n")
-            f.write(f"  Clusterhead: {cluster.clusterhead.id if cluster.clusterhead else 'None'}\n")
+    first_query = None
+    waiting = 0.0  # Seconds blocked on input(), left out of the time-to-first-query metric
 
-def main():
+    def prompt(text):
+        nonlocal waiting
+        start = time.perf_counter()
+        answer = input(text)
+        waiting += time.perf_counter() - start
+        return answer
 
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
     while True:
         print("\n1. Random mode")
         print("2. User mode")
         print("3. Quit")
-        choice = input("Enter your choice: ")
+        choice = prompt("Enter your choice: ")
 
         if choice == '1':
-<<<<<<< HEAD
             # Random mode: Initialize WSN with random nodes
             wsn = WSN(20, 20, 5)  # 20x20 grid, 5x5 clusters
-=======
-            # Reinitialize WSN for Random mode
-            wsn = WSN(20, 20, 5)  # Initialize a 20x20 network with 5x5 clusters
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
             num_nodes = random.randint(10, 100)
-            for i in range(num_nodes):
-                wsn.add_node(generate_random_node(i))
+            wsn.add_nodes(generate_random_node(i) for i in range(num_nodes))
             wsn.elect_clusterheads()
-<<<<<<< HEAD
             write_network_to_file('network.txt', wsn)
             print(f"\nRandom network information has been written to network.txt")
 
         elif choice == '2':
             # User mode: Initialize WSN with nodes from input.txt
-            wsn = WSN(20, 20, 5)
-=======
-            write_network_to_file('network.txt', wsn)  # Save random mode data to network_random.txt
-            print(f"\nRandom network information has been written to network_random.txt")
-        elif choice == '2':
-            # Reinitialize WSN for User mode
-            wsn = WSN(20, 20, 5)  # Initialize a 20x20 network with 5x5 clusters
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
-            nodes = read_nodes_from_file('input.txt')
-            for node in nodes:
-                wsn.add_node(node)
-            wsn.elect_clusterheads()
+            # Reuses the cached network (clusters, heads and adjacency) when input.txt has not changed
+            wsn = load_or_build('input.txt', SNAPSHOT_CACHE)
             write_network_to_file('network.txt', wsn)
             print(f"\nNetwork information has been written to network.txt")
-<<<<<<< HEAD
 
         elif choice == '3':
             break
 
-=======
-        elif choice == '3':
-            break
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
         else:
             print("Invalid choice. Please try again.")
             continue
 
-<<<<<<< HEAD
         # Display cluster information
         print("\nCluster Information:")
         for cluster in wsn.clusters:
@@ -329,38 +780,24 @@ def main():
                 print(f"  Clusterhead: {cluster.clusterhead.node_id if cluster.clusterhead else 'None'}")
 
         # Handle routing
-=======
-        print("\nCluster Information:")
-        for cluster in wsn.clusters:
-            print(f"Cluster {cluster.id}:")
-            print(f"  Nodes: {', '.join(str(node.id) for node in cluster.nodes)}")
-            print(f"  Clusterhead: {cluster.clusterhead.id if cluster.clusterhead else 'None'}")
-
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
         while True:
-            source = input("\nEnter source node ID (or 'q' to go back to main menu): ")
+            source = prompt("\nEnter source node ID (or 'q' to go back to main menu): ")
             if source.lower() == 'q':
                 break
-            dest = input("Enter destination node ID: ")
+            dest = prompt("Enter destination node ID: ")
 
             try:
                 source_id = int(source)
                 dest_id = int(dest)
-                route = wsn.route(source_id, dest_id)
-                if route:
-<<<<<<< HEAD
-                    print("Route:", ' -> '.join(str(node.node_id) for node in route))
-=======
-                    print("Route:", ' -> '.join(str(node.id) for node in route))
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
-                else:
+                result = wsn.route(source_id, dest_id)
+                print(result.describe())
+                if first_query is None:
+                    first_query = time.perf_counter() - LAUNCHED - waiting
+                    print(f"Time to first query: {first_query * 1000:.1f} ms (excluding time spent at prompts)")
+                if not result:
                     print("No route found between the specified nodes.")
             except ValueError:
                 print("Invalid input. Please enter valid node IDs.")
 
 if __name__ == "__main__":
-<<<<<<< HEAD
-    main()
-=======
     main()
->>>>>>> 571bb4f68a5c9180f76b1e1e5f0920bbc7aa0f8f
@@ -0,0 +1,128 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then reported as n/a
+    resource = None
+
+from main import WSN, add_network_arguments, read_nodes_from_file, write_network_to_file
+
+def peak_rss():
+    # Peak resident set size of this process in bytes, or None where getrusage is unavailable
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports kilobytes
+
+def _mib(value):
+    return f"{value / 2 ** 20:9.2f}" if value is not None else "      n/a"
+
+class StageStats:
+    def __init__(self, name, seconds, retained, peak, rss, rss_growth, sites):
+        self.name = name
+        self.seconds = seconds
+        self.retained = retained  # Bytes still allocated after the stage, relative to its start
+        self.peak = peak  # Highest traced allocation during the stage, relative to its start
+        self.rss = rss  # Process peak RSS after the stage
+        self.rss_growth = rss_growth  # How much the stage raised the process peak RSS
+        self.sites = sites  # [(file:line, bytes retained, allocation count)], largest first
+
+class StageProfiler:
+    # Wraps pipeline stages in `with profiler.stage(name):` and records, per stage, the tracemalloc
+    # allocations it retained and peaked at, and the top source lines that retained them. The process peak
+    # RSS never goes down, so a stage's RSS growth is only non-zero when it set a new high-water mark.
+    def __init__(self, top=5, frames=1):
+        self.top = top
+        self.frames = frames
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(self.frames)
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        rss_before = peak_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            rss = peak_rss()
+            # Ignore the profiler's own bookkeeping
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+            sites = [(f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size_diff, stat.count_diff)
+                     for stat in diff if stat.size_diff > 0][:self.top]
+            self.stages.append(StageStats(name, seconds, current - base, peak - base, rss,
+                                          rss - rss_before if rss is not None else None, sites))
+            if started_here:
+                tracemalloc.stop()
+
+    def report(self):
+        lines = [f"{'Stage':<20}{'Time (s)':>10}{'Retained MiB':>14}{'Peak MiB':>11}{'RSS MiB':>11}{'RSS +MiB':>11}"]
+        for s in self.stages:
+            lines.append(f"{s.name:<20}{s.seconds:>10.3f}{_mib(s.retained):>14}{_mib(s.peak):>11}"
+                         f"{_mib(s.rss):>11}{_mib(s.rss_growth):>11}")
+        for s in self.stages:
+            if s.sites:
+                lines.append(f"\nTop allocation sites in {s.name}:")
+                for site, size, count in s.sites:
+                    lines.append(f"  {size / 1024:10.1f} KiB in {count:8d} blocks  {os.path.relpath(site)}")
+        return '\n'.join(lines)
+
+def profile_pipeline(input_file, routes=1000, output=os.devnull, seed=None, top=5, frames=1,
+                     width=20, height=20, cluster_size=5):
+    # The interactive user-mode pipeline plus a routing batch, one profiled stage per step
+    profiler = StageProfiler(top, frames)
+    tracemalloc.start(frames)
+    try:
+        with profiler.stage('load'):
+            nodes = read_nodes_from_file(input_file)
+        with profiler.stage('cluster assignment'):
+            wsn = WSN(width, height, cluster_size)
+            wsn.add_nodes(nodes)
+        with profiler.stage('election'):
+            wsn.elect_clusterheads()
+        with profiler.stage('output'):
+            write_network_to_file(output, wsn)
+        with profiler.stage('adjacency'):
+            wsn.build_adjacency()
+        with profiler.stage('routing batch'):
+            ids = list(wsn.node_map)
+            rng = random.Random(seed)
+            results = []
+            if len(ids) > 1:
+                for _ in range(routes):
+                    results.append(wsn.route(*rng.sample(ids, 2)))
+    finally:
+        tracemalloc.stop()
+    return profiler
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage memory profile of the WSN pipeline")
+    add_network_arguments(parser)
+    parser.add_argument('--routes', type=int, default=1000, help="queries in the routing batch")
+    parser.add_argument('--output', default=os.devnull, help="where the output stage writes the network")
+    parser.add_argument('--top', type=int, default=5, help="allocation sites listed per stage")
+    parser.add_argument('--frames', type=int, default=1, help="traceback depth recorded per allocation")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    profiler = profile_pipeline(args.input, args.routes, args.output, args.seed, args.top, args.frames,
+                                args.width, args.height, args.cell)
+    print(profiler.report())
+
+if __name__ == "__main__":
+    main()
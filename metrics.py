@@ -0,0 +1,307 @@
+import argparse
+import math
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from main import add_network_arguments, build_network
+
+# Route latencies in seconds: greedy routes on a few thousand nodes take tens of microseconds to milliseconds
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1, 1.0)
+HOP_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _format(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class _CounterValue:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+class _HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Per bucket, not cumulative; the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # Bucket i holds values in (bounds[i-1], bounds[i]], Prometheus' "le" semantics
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Family:
+    # A named metric and its children, one per combination of label values. Updates are plain attribute
+    # arithmetic under the GIL; labels() caches each child, so hot paths pay one dict lookup per update.
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        # (metric name, label pairs, value) lines for the exposition
+        for values, child in list(self._children.items()):
+            yield self.name, list(zip(self.labelnames, values)), child.value
+
+    def exposition(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, pairs, value in self._samples():
+            lines.append(f"{name}{_label_text(pairs)} {_format(value)}")
+        return lines
+
+class Counter(_Family):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+class Gauge(_Family):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value):
+        self.labels().set(value)
+
+class Histogram(_Family):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            pairs = list(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), list(child.counts)):
+                cumulative += count
+                yield self.name + '_bucket', pairs + [('le', _format(float(bound)))], cumulative
+            yield self.name + '_sum', pairs, child.sum
+            yield self.name + '_count', pairs, child.count
+
+class Registry:
+    def __init__(self):
+        self._families = {}
+
+    def _register(self, family):
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def exposition(self):
+        # Prometheus text format (version 0.0.4)
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.exposition())
+        return '\n'.join(lines) + '\n'
+
+class WSNMetrics:
+    # The metrics a WSN reports to once assigned to wsn.metrics. WSN.route, routing.geo_route and
+    # routing.energy_route count queries and time them, WSN.elect_clusterheads and build_adjacency record
+    # rebuilds, and the snapshot and planar-graph caches count hits and misses. With wsn.metrics left at
+    # None those paths only pay an attribute check.
+    def __init__(self, registry=None):
+        self.registry = registry = registry or Registry()
+        self.routes = registry.counter('wsn_routes_total', "Route queries by strategy and outcome",
+                                       ('strategy', 'status'))
+        self.route_seconds = registry.histogram('wsn_route_duration_seconds', "Time to compute one route",
+                                                ('strategy',))
+        self.route_hops = registry.histogram('wsn_route_hops', "Hops of delivered routes", ('strategy',),
+                                             HOP_BUCKETS)
+        self.elections = registry.counter('wsn_elections_total', "Network-wide clusterhead elections")
+        self.election_seconds = registry.histogram('wsn_election_duration_seconds',
+                                                   "Time to elect clusterheads in every cluster")
+        self.head_changes = registry.counter('wsn_clusterhead_changes_total',
+                                             "Clusters whose clusterhead changed at an election")
+        self.clusterheads = registry.gauge('wsn_clusterheads', "Clusters with a clusterhead after the last election")
+        self.nodes = registry.gauge('wsn_nodes', "Nodes in the network at the last election")
+        self.adjacency_builds = registry.counter('wsn_adjacency_builds_total', "Adjacency index rebuilds")
+        self.adjacency_seconds = registry.histogram('wsn_adjacency_build_duration_seconds',
+                                                    "Time to rebuild the adjacency indexes")
+        self.cache_lookups = registry.counter('wsn_cache_lookups_total', "Cache lookups by cache and result",
+                                              ('cache', 'result'))
+
+    def observe_route(self, strategy, result, seconds):
+        self.routes.labels(strategy, result.status.value).inc()
+        self.route_seconds.labels(strategy).observe(seconds)
+        if result:
+            self.route_hops.labels(strategy).observe(len(result.path) - 1)
+
+    def observe_election(self, wsn, changed, seconds):
+        self.elections.inc()
+        self.election_seconds.observe(seconds)
+        self.head_changes.inc(changed)
+        self.clusterheads.set(sum(1 for c in wsn.clusters if c.clusterhead is not None))
+        self.nodes.set(len(wsn.nodes))
+
+    def observe_adjacency(self, seconds):
+        self.adjacency_builds.inc()
+        self.adjacency_seconds.observe(seconds)
+
+    def observe_cache(self, cache, hit):
+        self.cache_lookups.labels(cache, 'hit' if hit else 'miss').inc()
+
+def serve(registry, port=9100, host='127.0.0.1'):
+    # Serve the exposition at http://host:port/metrics from a daemon thread; call shutdown() on the result to stop
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.exposition().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # Scrapes every few seconds would drown the console
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class FileDumper:
+    # Rewrites path with the exposition every interval seconds (e.g. for node_exporter's textfile collector).
+    # Each dump goes to a temporary file first and is renamed over path, so readers never see half a file.
+    def __init__(self, registry, path, interval=15.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def dump(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.registry.exposition())
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def stop(self):
+        # Stops the thread and writes one last dump with the final values
+        self._stop.set()
+        self._thread.join()
+        self.dump()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a random query load and expose its metrics")
+    add_network_arguments(parser)
+    parser.add_argument('--port', type=int, default=None, help="serve /metrics on this local port")
+    parser.add_argument('--file', default=None, help="dump the metrics to this file periodically")
+    parser.add_argument('--interval', type=float, default=15.0, help="seconds between file dumps")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run (0 = until interrupted)")
+    parser.add_argument('--rate', type=float, default=0, help="route queries per second (0 = as fast as possible)")
+    parser.add_argument('--elect-every', type=float, default=5.0, help="seconds between clusterhead elections")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    metrics = WSNMetrics()
+    wsn = build_network(args.input, args.width, args.height, args.cell, metrics)
+    if not wsn.nodes:
+        print("No nodes in the network.")
+        return
+
+    server = serve(metrics.registry, args.port) if args.port is not None else None
+    dumper = FileDumper(metrics.registry, args.file, args.interval) if args.file else None
+    if server:
+        print(f"Serving metrics on http://127.0.0.1:{server.server_address[1]}/metrics")
+
+    rng = random.Random(args.seed)
+    ids = list(wsn.node_map)
+    start = last_election = time.perf_counter()
+    queries = 0
+    try:
+        while not args.duration or time.perf_counter() - start < args.duration:
+            wsn.route(rng.choice(ids), rng.choice(ids))
+            queries += 1
+            now = time.perf_counter()
+            if args.elect_every and now - last_election >= args.elect_every:
+                wsn.elect_clusterheads()
+                last_election = now
+            if args.rate:
+                time.sleep(max(0.0, start + queries / args.rate - now))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if dumper:
+            dumper.stop()
+        if server:
+            server.shutdown()
+    elapsed = time.perf_counter() - start
+    print(f"{queries} queries in {elapsed:.1f} s ({queries / elapsed:.0f} queries/s)")
+    if not server and not dumper:
+        print(metrics.registry.exposition(), end='')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import numpy as np
+
+from main import WSN, add_network_arguments, build_network
+
+class MobilityModel:
+    # Base class: keeps every node's position in NumPy arrays and pushes each tick's moves into the WSN.
+    # Only nodes whose cluster cell changed go through WSN.move_node (membership + re-election);
+    # everyone else just gets new coordinates.
+    def __init__(self, wsn, seed=None, mobile=1.0, relink_fraction=0.05):
+        self.wsn = wsn
+        self.rng = np.random.default_rng(seed)
+        self.nodes = list(wsn.nodes)
+        n = len(self.nodes)
+        self.x = np.fromiter((node.x for node in self.nodes), dtype=np.float64, count=n)
+        self.y = np.fromiter((node.y for node in self.nodes), dtype=np.float64, count=n)
+        # mobile is either a fraction of nodes picked at random or an explicit boolean mask
+        if np.isscalar(mobile):
+            self.mobile = self.rng.random(n) < mobile
+        else:
+            self.mobile = np.asarray(mobile, dtype=bool)
+        self.cells = self._cells(self.x, self.y)
+        # Above this fraction of moved nodes it is cheaper to rebuild the adjacency than to relink one by one
+        self.relink_fraction = relink_fraction
+        self.crossings = 0  # Total cell-boundary crossings so far
+
+    @property
+    def _adaptive(self):
+        # Non-uniform layouts (e.g. quadtree.AdaptiveWSN) answer point lookups themselves
+        return type(self.wsn).cluster_index is not WSN.cluster_index
+
+    def _cells(self, x, y):
+        if self._adaptive:
+            return np.fromiter(map(self.wsn.cluster_index, x.tolist(), y.tolist()), dtype=np.int64, count=len(x))
+        size = self.wsn.cluster_size
+        columns = -(-self.wsn.width // size)
+        inside = (x >= 0) & (x < self.wsn.width) & (y >= 0) & (y < self.wsn.height)
+        cells = (y // size).astype(np.int64) * columns + (x // size).astype(np.int64)
+        return np.where(inside, cells, -1)
+
+    def _clip(self, x, y):
+        return (np.clip(x, 0, np.nextafter(self.wsn.width, 0)),
+                np.clip(y, 0, np.nextafter(self.wsn.height, 0)))
+
+    def advance(self, dt):
+        # Return the new (x, y) arrays after dt seconds; implemented by subclasses
+        raise NotImplementedError
+
+    def step(self, dt=1.0):
+        new_x, new_y = self.advance(dt)
+        new_cells = self._cells(new_x, new_y)
+        if self._adaptive:
+            # Cells may have split since the last tick, so compare against actual membership
+            self.cells = np.fromiter((node.cluster.cluster_id if node.cluster else -1 for node in self.nodes),
+                                     dtype=np.int64, count=len(self.nodes))
+        moved = np.flatnonzero((new_x != self.x) | (new_y != self.y))
+        crossed = set(np.flatnonzero(new_cells != self.cells).tolist())
+
+        wsn = self.wsn
+        relink = wsn.out_neighbors is not None and len(moved) <= self.relink_fraction * len(self.nodes)
+        nodes = self.nodes
+        xs = new_x.tolist()
+        ys = new_y.tolist()
+        # Nodes staying in their cell are updated first, so that any re-clustering triggered by the
+        # crossing nodes (e.g. an adaptive cell splitting) already sees their new positions
+        through_wsn = []
+        for i in moved.tolist():
+            if i in crossed or relink:
+                through_wsn.append(i)
+            else:
+                nodes[i].x = xs[i]
+                nodes[i].y = ys[i]
+        for i in through_wsn:
+            wsn.move_node(nodes[i].node_id, xs[i], ys[i], relink)
+        if len(moved) and not relink:
+            wsn.invalidate_adjacency()  # Rebuilt lazily by the next routing query
+
+        self.x = new_x
+        self.y = new_y
+        self.cells = new_cells
+        self.crossings += len(crossed)
+        return len(moved), len(crossed)
+
+    def run(self, ticks, dt=1.0):
+        for _ in range(ticks):
+            self.step(dt)
+
+class RandomWalk(MobilityModel):
+    # Each tick every mobile node moves at its speed in a fresh random direction, reflecting off the field edges
+    def __init__(self, wsn, speed=(0.5, 1.5), **kwargs):
+        super().__init__(wsn, **kwargs)
+        self.speed = speed
+
+    def advance(self, dt):
+        n = len(self.nodes)
+        angle = self.rng.uniform(0, 2 * np.pi, n)
+        distance = self.rng.uniform(self.speed[0], self.speed[1], n) * dt * self.mobile
+        x = self.x + distance * np.cos(angle)
+        y = self.y + distance * np.sin(angle)
+        # Reflect at the borders
+        width = self.wsn.width
+        height = self.wsn.height
+        x = np.where(x < 0, -x, np.where(x >= width, 2 * width - x, x))
+        y = np.where(y < 0, -y, np.where(y >= height, 2 * height - y, y))
+        return self._clip(x, y)
+
+class RandomWaypoint(MobilityModel):
+    # Mobile nodes travel in straight lines to random waypoints at a random speed, pause, then pick the next one
+    def __init__(self, wsn, speed=(0.5, 1.5), pause=(0.0, 2.0), **kwargs):
+        super().__init__(wsn, **kwargs)
+        self.speed_range = speed
+        self.pause_range = pause
+        n = len(self.nodes)
+        self.target_x = self.x.copy()
+        self.target_y = self.y.copy()
+        self.speed = np.zeros(n)
+        self.pause = np.zeros(n)
+        self._new_waypoints(np.flatnonzero(self.mobile))
+
+    def _new_waypoints(self, index):
+        k = len(index)
+        self.target_x[index] = self.rng.uniform(0, self.wsn.width, k)
+        self.target_y[index] = self.rng.uniform(0, self.wsn.height, k)
+        self.speed[index] = self.rng.uniform(self.speed_range[0], self.speed_range[1], k)
+
+    def advance(self, dt):
+        # Pausing nodes burn their pause time first, the rest moves towards the waypoint
+        travel = np.maximum(dt - self.pause, 0.0)
+        self.pause = np.maximum(self.pause - dt, 0.0)
+        dx = self.target_x - self.x
+        dy = self.target_y - self.y
+        remaining = np.hypot(dx, dy)
+        step = np.minimum(self.speed * travel, remaining)
+        scale = np.divide(step, remaining, out=np.zeros_like(step), where=remaining > 0)
+        x = self.x + dx * scale * self.mobile
+        y = self.y + dy * scale * self.mobile
+
+        arrived = np.flatnonzero(self.mobile & (step >= remaining) & (travel > 0))
+        if len(arrived):
+            self.pause[arrived] = self.rng.uniform(self.pause_range[0], self.pause_range[1], len(arrived))
+            self._new_waypoints(arrived)
+        return self._clip(x, y)
+
+MODELS = {'walk': RandomWalk, 'waypoint': RandomWaypoint}
+
+def main():
+    parser = argparse.ArgumentParser(description="Move nodes with a mobility model and track re-clustering")
+    add_network_arguments(parser)
+    parser.add_argument('--model', choices=sorted(MODELS), default='waypoint')
+    parser.add_argument('--ticks', type=int, default=100)
+    parser.add_argument('--dt', type=float, default=1.0)
+    parser.add_argument('--mobile', type=float, default=1.0, help="fraction of nodes that move")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+
+    model = MODELS[args.model](wsn, seed=args.seed, mobile=args.mobile)
+    for tick in range(1, args.ticks + 1):
+        moved, crossed = model.step(args.dt)
+        if crossed:
+            print(f"Tick {tick}: {moved} nodes moved, {crossed} changed cluster")
+    print(f"{model.crossings} cluster changes over {args.ticks} ticks")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import math
+import os
+import random
+import time
+from multiprocessing import Pool, shared_memory
+import numpy as np
+
+from main import RouteResult, RouteStatus, add_network_arguments, build_network
+
+# Status codes returned by workers, in the order of _STATUSES
+_STATUSES = (RouteStatus.OK, RouteStatus.NO_NEIGHBORS, RouteStatus.LOOP, RouteStatus.UNKNOWN_NODE)
+_OK, _NO_NEIGHBORS, _LOOP, _UNKNOWN = range(4)
+
+def csr_adjacency(wsn, symmetric=False):
+    # Node columns and CSR adjacency of a WSN as NumPy arrays (rows in wsn.nodes order), plus node_id -> row
+    if wsn.out_neighbors is None:
+        wsn.build_adjacency()
+    index = {node.node_id: i for i, node in enumerate(wsn.nodes)}
+    adjacency = wsn.sym_neighbors if symmetric else wsn.out_neighbors
+    counts = [len(adjacency[node.node_id]) for node in wsn.nodes]
+    indptr = np.zeros(len(wsn.nodes) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.fromiter((index[n.node_id] for node in wsn.nodes for n in adjacency[node.node_id]),
+                          dtype=np.int32, count=int(indptr[-1]))
+    arrays = {
+        'ids': np.fromiter((node.node_id for node in wsn.nodes), dtype=np.int64, count=len(wsn.nodes)),
+        'x': np.fromiter((node.x for node in wsn.nodes), dtype=np.float64, count=len(wsn.nodes)),
+        'y': np.fromiter((node.y for node in wsn.nodes), dtype=np.float64, count=len(wsn.nodes)),
+        'indptr': indptr,
+        'indices': indices,
+    }
+    return arrays, index
+
+class SharedTopology:
+    # Node columns and the CSR adjacency of a WSN copied once into shared memory blocks,
+    # which worker processes map as typed memoryviews without copying
+    def __init__(self, wsn, symmetric=False):
+        arrays, index = csr_adjacency(wsn, symmetric)
+        self.index = index  # node_id -> row in the shared arrays
+        self.ids = arrays['ids']
+        self._blocks = []
+        self.spec = {}  # name -> (shared memory name, dtype, length); picklable, sent to workers
+        for name, values in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            self._blocks.append(block)
+            self.spec[name] = (block.name, values.dtype.str, len(values))
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Per-worker state, filled in by _attach when each pool process starts
+_worker = {}
+
+def _attach(spec):
+    # Workers index the arrays one element at a time, where a typed memoryview over the shared block returns
+    # plain Python numbers far faster than NumPy scalar indexing, and still without copying
+    for name, (shm_name, dtype, length) in spec.items():
+        block = shared_memory.SharedMemory(name=shm_name)
+        dtype = np.dtype(dtype)
+        _worker[name] = block.buf[:length * dtype.itemsize].cast(dtype.char)
+        _worker['_' + name] = block  # Keep the mapping alive for the worker's lifetime
+
+def _route_rows(pairs):
+    # Greedy routing over the shared arrays, with the same distance arithmetic and tie-breaking as WSN.route
+    x = _worker['x']
+    y = _worker['y']
+    indptr = _worker['indptr']
+    indices = _worker['indices']
+    sqrt = math.sqrt
+    results = []
+    for source, dest in pairs:
+        if source < 0 or dest < 0:
+            results.append((_UNKNOWN, [], 0.0, dest if source >= 0 else source))
+            continue
+        xd = x[dest]
+        yd = y[dest]
+        path = [source]
+        visited = {source}
+        distance = 0.0
+        current = source
+        status = _OK
+        failed_at = None
+        while current != dest:
+            neighbors = indices[indptr[current]:indptr[current + 1]]
+            if not neighbors:
+                status, failed_at = _NO_NEIGHBORS, current
+                break
+            next_hop = -1
+            best = math.inf
+            for j in neighbors:  # First minimum wins, like min() over the neighbour list
+                d = sqrt((x[j] - xd)**2 + (y[j] - yd)**2)
+                if d < best:
+                    next_hop, best = j, d
+            if next_hop in visited:
+                status, failed_at = _LOOP, next_hop
+                break
+            distance += sqrt((x[current] - x[next_hop])**2 + (y[current] - y[next_hop])**2)
+            path.append(next_hop)
+            visited.add(next_hop)
+            current = next_hop
+        results.append((status, path, distance, failed_at))
+    return results
+
+class ParallelRouter:
+    # Pool of worker processes attached to one SharedTopology; reuse it across batches
+    def __init__(self, wsn, workers=None, symmetric=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.topology = SharedTopology(wsn, symmetric)
+        self._pool = Pool(self.workers, initializer=_attach, initargs=(self.topology.spec,))
+
+    def route_batch(self, queries, chunk_size=None):
+        # Route (source_id, dest_id) pairs across the workers; results come back in query order
+        index = self.topology.index
+        pairs = [(index.get(source_id, -1), index.get(dest_id, -1)) for source_id, dest_id in queries]
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(pairs) // (self.workers * 4)))
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+
+        ids = self.topology.ids.tolist()
+        results = []
+        query_iter = iter(queries)
+        for chunk in self._pool.imap(_route_rows, chunks):
+            for status, path, distance, failed_at in chunk:
+                source_id, dest_id = next(query_iter)
+                if status == _UNKNOWN:
+                    failed_at = source_id if source_id not in index else dest_id
+                elif failed_at is not None:
+                    failed_at = ids[failed_at]
+                results.append(RouteResult(_STATUSES[status], [ids[i] for i in path], distance, failed_at))
+        return results
+
+    def imap(self, func, chunks):
+        # Run another module-level worker function over the shared topology (it reads parallel._worker)
+        return self._pool.imap(func, chunks)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        self.topology.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def route_batch(wsn, queries, workers=None, symmetric=False):
+    with ParallelRouter(wsn, workers, symmetric) as router:
+        return router.route_batch(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Route a random batch of queries across worker processes")
+    add_network_arguments(parser)
+    parser.add_argument('--queries', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    rng = random.Random(args.seed)
+    ids = list(wsn.node_map)
+    queries = [(rng.choice(ids), rng.choice(ids)) for _ in range(args.queries)]
+
+    with ParallelRouter(wsn, args.workers) as router:
+        start = time.perf_counter()
+        results = router.route_batch(queries)
+        elapsed = time.perf_counter() - start
+    delivered = sum(1 for result in results if result)
+    print(f"{len(results)} queries on {router.workers} workers in {elapsed:.3f} s "
+          f"({len(results) / elapsed:.0f} queries/s), {delivered} routed")
+
+if __name__ == "__main__":
+    main()
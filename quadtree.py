@@ -0,0 +1,154 @@
+import argparse
+import math
+
+from main import WSN, Cluster, add_network_arguments, build_network, read_nodes_from_file, write_network_to_file
+
+class AdaptiveWSN(WSN):
+    # WSN whose clusters are the leaves of a quadtree over the field instead of fixed cells: a leaf splits
+    # into four as soon as it holds more than max_nodes nodes (down to min_size), so dense regions get
+    # small clusters and sparse regions stay as one large cluster.
+    #
+    # A leaf at level L covering cell (ix, iy) is keyed (L, ix, iy) with ix = floor(x / side * 2^L). Every
+    # ancestor of a leaf is internal and nothing exists below it, so the leaf containing a point is found by
+    # binary search over the level with hash lookups: O(log depth) instead of walking down the tree.
+    def __init__(self, width, height, max_nodes=8, min_size=1.0):
+        self.max_nodes = max_nodes
+        self.min_size = min_size
+        self.side = max(width, height)  # The root is square; parts outside the field simply stay empty
+        self.max_level = max(0, int(math.floor(math.log2(self.side / min_size)))) if min_size > 0 else 0
+        self._leaves = {}  # (level, ix, iy) -> Cluster
+        self._internal = set()  # (level, ix, iy) of split cells
+        self._keys = {}  # cluster_id -> (level, ix, iy)
+        super().__init__(width, height, self.side)
+
+    def _initialize_clusters(self):
+        root = Cluster(0, 0, 0, self.side)
+        self.clusters.append(root)
+        self._leaves[(0, 0, 0)] = root
+        self._keys[0] = (0, 0, 0)
+
+    def _blank(self):
+        return AdaptiveWSN(self.width, self.height, self.max_nodes, self.min_size)
+
+    def leaf_key(self, x, y):
+        # (level, ix, iy) of the leaf containing (x, y), or None outside the field
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        u = x / self.side
+        v = y / self.side
+        lo = 0
+        hi = self.max_level
+        while lo <= hi:
+            level = (lo + hi) // 2
+            scale = 1 << level
+            key = (level, int(u * scale), int(v * scale))
+            if key in self._leaves:
+                return key
+            if key in self._internal:
+                lo = level + 1
+            else:
+                hi = level - 1
+        return None
+
+    def cluster_index(self, x, y):
+        key = self.leaf_key(x, y)
+        return self._leaves[key].cluster_id if key is not None else -1
+
+    def add_node(self, node):
+        super().add_node(node)
+        cluster = node.cluster
+        if cluster is not None and len(cluster.nodes) > self.max_nodes:
+            self._split(cluster)
+
+    def move_node(self, node_id, x, y, relink=True):
+        node = super().move_node(node_id, x, y, relink)
+        if node.cluster is not None and len(node.cluster.nodes) > self.max_nodes:
+            self._split(node.cluster)
+        return node
+
+    def _split(self, cluster):
+        # Replace an overfull leaf by its four children, repeatedly while a child is still overfull. The
+        # first child reuses the parent's Cluster object (and ID) so cluster IDs stay dense and stable.
+        level, ix, iy = self._keys[cluster.cluster_id]
+        if level >= self.max_level:
+            return
+        had_head = cluster.clusterhead is not None
+        nodes = cluster.nodes
+        del self._leaves[(level, ix, iy)]
+        self._internal.add((level, ix, iy))
+
+        child_level = level + 1
+        scale = 1 << child_level
+        size = self.side / scale
+        children = {}
+        for dy in (0, 1):
+            for dx in (0, 1):
+                key = (child_level, 2 * ix + dx, 2 * iy + dy)
+                if not children:
+                    child = cluster
+                    child.x = key[1] * size
+                    child.y = key[2] * size
+                    child.size = size
+                    child.nodes = []
+                    child.clusterhead = None
+                    child.version += 1
+                else:
+                    child = Cluster(len(self.clusters), key[1] * size, key[2] * size, size)
+                    self.clusters.append(child)
+                self._leaves[key] = child
+                self._keys[child.cluster_id] = key
+                children[key] = child
+
+        for node in nodes:
+            key = (child_level, int(node.x / self.side * scale), int(node.y / self.side * scale))
+            node.cluster = None  # The first child is the parent's Cluster object, so detach before re-adding
+            children[key].add_node(node)
+
+        for child in children.values():
+            if had_head:
+                child.elect_clusterhead()
+            if len(child.nodes) > self.max_nodes:
+                self._split(child)
+
+    def depth(self):
+        return max(level for level, _, _ in self._leaves)
+
+    def save_snapshot(self, path, input_file=None):
+        raise TypeError("Snapshots only support the fixed-grid WSN layout")
+
+def load_summary(wsn):
+    # Per-cluster load statistics over the clusters that cover part of the field
+    sizes = [len(c.nodes) for c in wsn.clusters if c.x < wsn.width and c.y < wsn.height]
+    occupied = [n for n in sizes if n]
+    return {
+        'clusters': len(sizes),
+        'empty': len(sizes) - len(occupied),
+        'max_nodes': max(sizes) if sizes else 0,
+        'mean_nodes': sum(occupied) / len(occupied) if occupied else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fixed-grid and adaptive quadtree clustering")
+    add_network_arguments(parser)
+    parser.add_argument('--max-nodes', type=int, default=8, help="split a cell above this many nodes")
+    parser.add_argument('--min-size', type=float, default=1.0, help="smallest cell side")
+    parser.add_argument('--output', default=None, help="write the adaptive network in network.txt format")
+    args = parser.parse_args()
+
+    fixed = build_network(args.input, args.width, args.height, args.cell)
+    adaptive = AdaptiveWSN(args.width, args.height, args.max_nodes, args.min_size)
+    adaptive.add_nodes(read_nodes_from_file(args.input))
+    adaptive.elect_clusterheads()
+
+    for name, wsn in ((f'fixed {args.cell}x{args.cell} cells', fixed), (f'quadtree (K={args.max_nodes})', adaptive)):
+        stats = load_summary(wsn)
+        print(f"{name}: {stats['clusters']} clusters, {stats['empty']} empty, "
+              f"max {stats['max_nodes']} / mean {stats['mean_nodes']:.1f} nodes per occupied cluster")
+    print(f"Quadtree depth: {adaptive.depth()}")
+
+    if args.output:
+        write_network_to_file(args.output, adaptive)
+        print(f"Adaptive network written to {args.output}")
+
+if __name__ == "__main__":
+    main()
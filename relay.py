@@ -0,0 +1,133 @@
+import argparse
+import random
+import numpy as np
+
+from main import add_network_arguments, build_network
+from parallel import csr_adjacency
+
+def next_hops(arrays, dest):
+    # Greedy next hop of every node towards row `dest`, with the same tie-breaking as WSN.route (first
+    # neighbour in list order). The destination and nodes without neighbours point to themselves.
+    x = arrays['x']
+    y = arrays['y']
+    indptr = arrays['indptr']
+    indices = arrays['indices']
+    n = len(x)
+    nxt = np.arange(n)
+    if not len(indices):
+        return nxt
+    to_dest = np.sqrt((x - x[dest]) ** 2 + (y - y[dest]) ** 2)[indices]
+    rows = np.flatnonzero(indptr[1:] > indptr[:-1])
+    best = np.minimum.reduceat(to_dest, indptr[rows])
+    owner = np.repeat(np.arange(n), np.diff(indptr))
+    hits = np.flatnonzero(to_dest == best[np.searchsorted(rows, owner)])
+    first = hits[np.r_[True, owner[hits][1:] != owner[hits][:-1]]]
+    nxt[owner[first]] = indices[first]
+    nxt[dest] = dest
+    return nxt
+
+def greedy_forest(arrays, dest):
+    # Follow the next-hop pointers by pointer doubling: a node reaches dest iff its chain ends there (chains
+    # that run into a loop or a dead end never do). Returns (next hops, reaches mask, hop count to dest).
+    nxt = next_hops(arrays, dest)
+    n = len(nxt)
+    jump = nxt
+    depth = (nxt != np.arange(n)).astype(np.int64)
+    for _ in range(max(1, n.bit_length())):
+        depth = depth + depth[jump]
+        jump = jump[jump]
+    reaches = jump == dest
+    return nxt, reaches, np.where(reaches, depth, -1)
+
+class RelayReport:
+    def __init__(self, ids, forwarded, pairs, delivered):
+        self.ids = ids  # Node ID per row
+        self.forwarded = forwarded  # Packets each node relayed (neither source nor destination)
+        self.pairs = pairs
+        self.delivered = delivered
+
+    def load(self):
+        return dict(zip(self.ids.tolist(), self.forwarded.tolist()))
+
+    def top(self, k=10):
+        # The k busiest relays as (node_id, packets forwarded)
+        order = np.argsort(-self.forwarded, kind='stable')[:k]
+        return [(int(self.ids[i]), int(self.forwarded[i])) for i in order if self.forwarded[i]]
+
+    def cluster_load(self, wsn):
+        # Per cluster: (cluster_id, packets relayed by its members, busiest member or None)
+        load = self.load()
+        rows = []
+        for cluster in wsn.clusters:
+            if not cluster.nodes:
+                continue
+            busiest = max(cluster.nodes, key=lambda n: load.get(n.node_id, 0))
+            total = sum(load.get(n.node_id, 0) for n in cluster.nodes)
+            rows.append((cluster.cluster_id, total, busiest.node_id if total else None))
+        return rows
+
+    def summary(self, wsn, k=10):
+        ratio = self.delivered / self.pairs * 100 if self.pairs else 0.0
+        lines = [f"Pairs: {self.pairs}, delivered: {self.delivered} ({ratio:.1f}%)", "Top relays:"]
+        for node_id, count in self.top(k):
+            lines.append(f"  Node {node_id}: {count} packets forwarded")
+        lines.append("Per-cluster load:")
+        for cluster_id, total, busiest in sorted(self.cluster_load(wsn), key=lambda row: -row[1])[:k]:
+            if total:
+                lines.append(f"  Cluster {cluster_id}: {total} packets, busiest node {busiest}")
+        return '\n'.join(lines)
+
+def relay_load(wsn, destinations=None, sources=None, symmetric=False):
+    # Packets each node forwards when every source sends one packet to every destination under greedy
+    # routing (default: all nodes as both). For one destination the greedy next hops form a forest, so
+    # one pass per destination counts every source's path at once: a node relays exactly the packets of
+    # the sources below it in the destination's tree, summed level by level from the leaves up.
+    arrays, index = csr_adjacency(wsn, symmetric)
+    n = len(index)
+    weight = np.zeros(n, dtype=np.int64)
+    if sources is None:
+        weight[:] = 1
+    else:
+        weight[[index[node_id] for node_id in sources]] = 1
+    rows = range(n) if destinations is None else [index[node_id] for node_id in destinations]
+
+    forwarded = np.zeros(n, dtype=np.int64)
+    pairs = delivered = 0
+    for dest in rows:
+        nxt, reaches, depth = greedy_forest(arrays, dest)
+        pairs += int(weight.sum() - weight[dest])
+        count = np.where(reaches, weight, 0)
+        delivered += int(count.sum() - count[dest])
+        below = count.copy()
+        order = np.argsort(-depth, kind='stable')
+        levels = depth[order]
+        bounds = np.flatnonzero(np.diff(levels)) + 1
+        for level in np.split(order, bounds):
+            if depth[level[0]] <= 0:
+                break
+            np.add.at(below, nxt[level], below[level])
+        relayed = below - count
+        relayed[dest] = 0
+        forwarded += relayed
+    return RelayReport(arrays['ids'], forwarded, pairs, delivered)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the nodes that relay the most traffic under greedy routing")
+    add_network_arguments(parser)
+    parser.add_argument('--sample', type=int, default=None, help="number of random destinations (default: all)")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--symmetric', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+
+    destinations = None
+    if args.sample is not None:
+        ids = list(wsn.node_map)
+        destinations = random.Random(args.seed).sample(ids, min(args.sample, len(ids)))
+    report = relay_load(wsn, destinations, symmetric=args.symmetric)
+    print(report.summary(wsn, args.top))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import json
+import time
+
+from main import LAUNCHED, Node, add_network_arguments, build_network, load_or_build
+from routing import GPSR, STRATEGIES, geo_route, planar_graph
+from simulator import percentile
+
+class ReplayReport:
+    def __init__(self, queries, events, errors, statuses, latencies, elapsed, first_query=None):
+        self.queries = queries  # Route queries answered
+        self.events = events  # Node add/fail events applied
+        self.errors = errors  # Lines that could not be parsed or applied
+        self.statuses = statuses  # RouteStatus value -> count
+        self.latencies = latencies  # Sorted per-query routing times, in seconds
+        self.elapsed = elapsed  # Wall-clock time for the whole replay, including I/O
+        self.first_query = first_query  # Seconds from process start (import of main) to the first answer
+        routing_time = sum(latencies)
+        self.queries_per_second = queries / routing_time if routing_time > 0 else 0.0
+
+    def summary(self):
+        lines = [f"Replayed {self.queries} route queries and {self.events} node events in {self.elapsed:.3f} s "
+                 f"({self.errors} bad lines)"]
+        lines.append("Statuses: " + ', '.join(f"{status}: {count}" for status, count in sorted(self.statuses.items())))
+        if self.first_query is not None:
+            lines.append(f"Time to first query: {self.first_query * 1000:.1f} ms")
+        if self.latencies:
+            lines.append(f"Routing throughput: {self.queries_per_second:.0f} queries/s")
+            lines.append("Latency (us): " + ', '.join(
+                f"p{q} {percentile(self.latencies, q) * 1e6:.1f}" for q in (50, 90, 99)
+            ) + f", max {self.latencies[-1] * 1e6:.1f}")
+        return '\n'.join(lines)
+
+def apply_line(wsn, request, symmetric=False):
+    # Apply one workload record and return the JSON-ready result; raises KeyError/ValueError/TypeError on bad input
+    if not isinstance(request, dict):
+        raise ValueError(f"expected a JSON object, got {type(request).__name__}")
+    op = request.get('op', 'route')
+    if op == 'route':
+        strategy = request.get('strategy')  # Optional routing.STRATEGIES name; default is WSN.route
+        if isinstance(STRATEGIES.get(strategy), GPSR):
+            # Like the adjacency, the planar graph is built once (and again after add/fail events) outside the
+            # per-query latency
+            planar_graph(wsn, STRATEGIES[strategy].planarization)
+        start = time.perf_counter()
+        if strategy is None:
+            result = wsn.route(int(request['source']), int(request['dest']), symmetric)
+        else:
+            result = geo_route(wsn, int(request['source']), int(request['dest']), strategy, symmetric)
+        latency = time.perf_counter() - start
+        return {'op': op, 'source': request['source'], 'dest': request['dest'], 'strategy': strategy or 'greedy',
+                'status': result.status.value, 'path': result.path, 'hops': result.hops,
+                'distance': round(result.distance, 4), 'failed_at': result.failed_at,
+                'latency_us': round(latency * 1e6, 2)}, latency
+    if op == 'add':
+        node_id = int(request['id']) if 'id' in request else max(wsn.node_map, default=0) + 1
+        if node_id in wsn.node_map:
+            raise ValueError(f"node {node_id} already exists")
+        node = Node(node_id, *(float(request[key]) for key in ('x', 'y', 'r', 'e', 'p')))
+        if wsn.cluster_index(node.x, node.y) < 0:
+            raise ValueError(f"node {node_id} at ({node.x}, {node.y}) is outside the field")
+        wsn.add_node(node)
+        if node.cluster is not None:
+            node.cluster.elect_clusterhead()
+        return {'op': op, 'id': node_id}, None
+    if op == 'fail':
+        node_id = int(request['node'])
+        if wsn.remove_node(node_id) is None:
+            raise ValueError(f"node {node_id} not found")
+        return {'op': op, 'id': node_id}, None
+    raise ValueError(f"unknown op '{op}'")
+
+def replay(wsn, requests_file, output_file, symmetric=False):
+    # Stream records from a JSONL workload, writing one JSONL result per record as it is answered
+    if wsn.out_neighbors is None:
+        wsn.build_adjacency()  # Keep one-off index construction out of the per-query latencies
+    queries = events = errors = 0
+    statuses = {}
+    latencies = []
+    first_query = None
+    start = time.perf_counter()
+    with open(requests_file, 'r', encoding='utf-8') as src, open(output_file, 'w', encoding='utf-8') as out:
+        for line_no, line in enumerate(src, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record, latency = apply_line(wsn, json.loads(line), symmetric)
+            except (ValueError, KeyError, TypeError) as e:
+                errors += 1
+                record, latency = {'error': str(e)}, None
+            record['line'] = line_no
+            out.write(json.dumps(record) + '\n')
+            if latency is not None:
+                if first_query is None:
+                    first_query = time.perf_counter() - LAUNCHED
+                queries += 1
+                latencies.append(latency)
+                statuses[record['status']] = statuses.get(record['status'], 0) + 1
+            elif 'error' not in record:
+                events += 1
+    latencies.sort()
+    return ReplayReport(queries, events, errors, statuses, latencies, time.perf_counter() - start, first_query)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a JSONL route workload against a built WSN")
+    parser.add_argument('requests', nargs='?', default='requests.jsonl')
+    add_network_arguments(parser)
+    parser.add_argument('--output', default='replay_results.jsonl')
+    parser.add_argument('--snapshot', default=None, help="reuse/refresh a network snapshot for the input")
+    parser.add_argument('--symmetric', action='store_true', help="only route over bidirectional links")
+    parser.add_argument('--metrics-port', type=int, default=None, help="serve Prometheus metrics on this local port")
+    parser.add_argument('--metrics-file', default=None, help="dump Prometheus metrics to this file periodically")
+    parser.add_argument('--metrics-interval', type=float, default=15.0, help="seconds between metrics file dumps")
+    args = parser.parse_args()
+
+    metrics = server = dumper = None
+    if args.metrics_port is not None or args.metrics_file:
+        from metrics import FileDumper, WSNMetrics, serve  # Only pay for http.server and threads when asked
+        metrics = WSNMetrics()
+        if args.metrics_port is not None:
+            server = serve(metrics.registry, args.metrics_port)
+            print(f"Serving metrics on http://127.0.0.1:{server.server_address[1]}/metrics")
+        if args.metrics_file:
+            dumper = FileDumper(metrics.registry, args.metrics_file, args.metrics_interval)
+
+    try:
+        if args.snapshot:
+            wsn = load_or_build(args.input, args.snapshot, args.width, args.height, args.cell, metrics)
+        else:
+            wsn = build_network(args.input, args.width, args.height, args.cell, metrics)
+
+        report = replay(wsn, args.requests, args.output, args.symmetric)
+    finally:
+        if dumper:
+            dumper.stop()
+        if server:
+            server.shutdown()
+    print(report.summary())
+    print(f"Results written to {args.output}")
+    if args.metrics_file:
+        print(f"Metrics written to {args.metrics_file}")
+
+if __name__ == "__main__":
+    main()
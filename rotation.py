@@ -0,0 +1,150 @@
+import argparse
+import heapq
+import random
+
+from lifetime import EnergyModel, simulate_lifetime
+from main import add_network_arguments, build_network
+
+class FenwickTree:
+    # Prefix sums over non-negative weights with O(log n) update and weighted sampling
+    def __init__(self, weights):
+        self.size = len(weights)
+        self.tree = [0.0] * (self.size + 1)
+        self.weights = [0.0] * self.size
+        for i, weight in enumerate(weights):
+            self.update(i, weight)
+
+    def update(self, i, weight):
+        delta = weight - self.weights[i]
+        self.weights[i] = weight
+        i += 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        total = 0.0
+        i = self.size
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target):
+        # Smallest index whose prefix sum exceeds target (0 <= target < total)
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return min(pos, self.size - 1)
+
+class StaticPolicy:
+    # Current behaviour: the highest-F node keeps the role; clusters are only re-elected when they lose their head
+    name = 'static'
+
+    def elect(self, wsn):
+        for cluster in wsn.clusters:
+            if cluster.nodes and (cluster.clusterhead is None or cluster.clusterhead.cluster is not cluster):
+                cluster.elect_clusterhead()
+
+class LeachPolicy:
+    # LEACH-style rotation adapted to fixed cells: every member serves exactly once per epoch. Within an
+    # epoch the LEACH threshold makes all not-yet-served members equally likely, which a per-cluster Fenwick
+    # tree samples in O(log n); a served member's weight drops to zero until the next epoch. With
+    # energy_weighted=True members are drawn in proportion to their residual energy at the epoch start, and
+    # members with no energy left sit the epoch out (unless nobody has any).
+    name = 'leach'
+
+    def __init__(self, seed=None, energy_weighted=False):
+        self.rng = random.Random(seed)
+        self.energy_weighted = energy_weighted
+        self._state = {}  # cluster_id -> (cluster version, members, FenwickTree, eligible count)
+
+    def _new_epoch(self, cluster):
+        members = list(cluster.nodes)
+        weights = [max(n.e, 0.0) if self.energy_weighted else 1.0 for n in members]
+        if not any(weights):
+            weights = [1.0] * len(members)
+        # The epoch ends once every positive weight has been drawn
+        return [cluster.version, members, FenwickTree(weights), sum(1 for w in weights if w > 0)]
+
+    def elect(self, wsn):
+        for cluster in wsn.clusters:
+            if not cluster.nodes:
+                cluster.clusterhead = None
+                self._state.pop(cluster.cluster_id, None)
+                continue
+            state = self._state.get(cluster.cluster_id)
+            # A membership change (death, mobility) or a finished epoch starts a new epoch
+            if state is None or state[0] != cluster.version or state[3] == 0:
+                state = self._state[cluster.cluster_id] = self._new_epoch(cluster)
+            _, members, tree, _ = state
+            slot = tree.find(self.rng.random() * tree.total())
+            tree.update(slot, 0.0)
+            state[3] -= 1
+            cluster.clusterhead = members[slot]
+
+class WeightedRoundRobin:
+    # F-weighted round robin (stride scheduling): each member holds a pass value and the lowest pass becomes
+    # head, then advances by 1 / F, so over many rounds members serve in proportion to their (current) F.
+    # A per-cluster binary heap makes each selection O(log n).
+    name = 'wrr'
+
+    def __init__(self):
+        self._heaps = {}  # cluster_id -> (cluster version, heap of (pass, node_id, node))
+
+    def _rebuild(self, cluster, old_heap):
+        # Keep the pass values of members that stayed; newcomers start at the current minimum
+        # so they neither monopolise the role nor wait behind everyone else
+        passes = {node_id: value for value, node_id, _ in old_heap}
+        start = min(passes.values()) if passes else 0.0
+        heap = [(passes.get(n.node_id, start), n.node_id, n) for n in cluster.nodes]
+        heapq.heapify(heap)
+        return heap
+
+    @staticmethod
+    def _stride(node):
+        return 1.0 / max(node.calculate_f(), 1e-9)
+
+    def elect(self, wsn):
+        for cluster in wsn.clusters:
+            if not cluster.nodes:
+                cluster.clusterhead = None
+                self._heaps.pop(cluster.cluster_id, None)
+                continue
+            version, heap = self._heaps.get(cluster.cluster_id, (None, []))
+            if version != cluster.version:
+                heap = self._rebuild(cluster, heap)
+                self._heaps[cluster.cluster_id] = (cluster.version, heap)
+            pass_value, node_id, node = heap[0]
+            heapq.heapreplace(heap, (pass_value + self._stride(node), node_id, node))
+            cluster.clusterhead = node
+
+POLICIES = {'static': StaticPolicy, 'leach': LeachPolicy, 'wrr': WeightedRoundRobin}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare network lifetime under clusterhead rotation policies")
+    add_network_arguments(parser)
+    parser.add_argument('--sink', type=int, default=None)
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), default=sorted(POLICIES))
+    parser.add_argument('--max-rounds', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    if len(wsn.nodes) < 2:
+        print("Need at least two nodes to compare policies.")
+        return
+
+    for name in args.policies:
+        policy = LeachPolicy(args.seed) if name == 'leach' else POLICIES[name]()
+        report = simulate_lifetime(wsn, policy, args.sink, EnergyModel(), max_rounds=args.max_rounds)
+        print(f"\n[{name}]")
+        print(report.summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+import argparse
+import heapq
+import math
+import random
+import time
+import weakref
+from bisect import bisect_right
+
+from lifetime import EnergyModel
+from main import RouteResult, RouteStatus, add_network_arguments, build_network
+
+def route_energy(wsn, path, model=None):
+    # Radio energy a packet spends along a path of node IDs: one transmission and one reception per hop
+    model = model or EnergyModel()
+    node_map = wsn.node_map
+    return sum(model.tx(node_map[a].distance_to(node_map[b])) + model.rx() for a, b in zip(path, path[1:]))
+
+def energy_route(wsn, source_id, dest_id, alpha=1.0, symmetric=False, model=None):
+    # Least-cost route where a hop u -> v costs distance(u, v) / e_v ** alpha, so relays with little
+    # residual energy look far away and are avoided while healthier detours exist. alpha=0 is plain
+    # shortest-distance routing. Nodes with no energy left are never used as receivers. Reported to
+    # wsn.metrics under the strategy 'energy-aware'.
+    start = time.perf_counter()
+    result = _energy_route(wsn, source_id, dest_id, alpha, symmetric, model)
+    if wsn.metrics is not None:
+        wsn.metrics.observe_route('energy-aware', result, time.perf_counter() - start)
+    return result
+
+def _energy_route(wsn, source_id, dest_id, alpha, symmetric, model):
+    # Dijkstra with a binary heap over the prebuilt neighbour lists, stopping as soon as the destination is settled
+    source = wsn.node_map.get(source_id)
+    dest = wsn.node_map.get(dest_id)
+    if source is None:
+        return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=source_id)
+    if dest is None:
+        return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=dest_id)
+    if source is dest:
+        return RouteResult(RouteStatus.OK, [source_id], 0.0, energy=0.0)
+    if not wsn.neighbors(source_id, symmetric):
+        return RouteResult(RouteStatus.NO_NEIGHBORS, [source_id], failed_at=source_id)
+
+    cost = {source_id: 0.0}
+    previous = {}
+    settled = set()
+    heap = [(0.0, source_id)]
+    while heap:
+        c, node_id = heapq.heappop(heap)
+        if node_id in settled:
+            continue
+        if node_id == dest_id:
+            break
+        settled.add(node_id)
+        node = wsn.node_map[node_id]
+        for other in wsn.neighbors(node_id, symmetric):
+            if other.e <= 0 or other.node_id in settled:
+                continue
+            candidate = c + node.distance_to(other) / other.e ** alpha
+            if candidate < cost.get(other.node_id, float('inf')):
+                cost[other.node_id] = candidate
+                previous[other.node_id] = node_id
+                heapq.heappush(heap, (candidate, other.node_id))
+    else:
+        return RouteResult(RouteStatus.UNREACHABLE, [source_id], failed_at=dest_id)
+
+    path = [dest_id]
+    while path[-1] != source_id:
+        path.append(previous[path[-1]])
+    path.reverse()
+    node_map = wsn.node_map
+    distance = sum(node_map[a].distance_to(node_map[b]) for a, b in zip(path, path[1:]))
+    return RouteResult(RouteStatus.OK, path, distance, energy=route_energy(wsn, path, model))
+
+class GeographicStrategy:
+    # Position-based forwarding: each hop looks only at the current node's neighbours and the destination's
+    # position. Subclasses pick the next hop; route() walks them like WSN.route, failing on a dead end or
+    # when a node would be visited twice.
+    name = None
+
+    def next_hop(self, current, dest, neighbors):
+        raise NotImplementedError
+
+    def route(self, wsn, source_id, dest_id, symmetric=False):
+        source = wsn.node_map.get(source_id)
+        dest = wsn.node_map.get(dest_id)
+        if source is None:
+            return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=source_id)
+        if dest is None:
+            return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=dest_id)
+
+        path = [source_id]
+        visited = {source_id}
+        distance = 0.0
+        current = source
+        while current is not dest:
+            neighbors = wsn.neighbors(current.node_id, symmetric)
+            if not neighbors:
+                return RouteResult(RouteStatus.NO_NEIGHBORS, path, distance, current.node_id)
+            nxt = dest if dest in neighbors else self.next_hop(current, dest, neighbors)
+            if nxt.node_id in visited:
+                return RouteResult(RouteStatus.LOOP, path, distance, nxt.node_id)
+            distance += current.distance_to(nxt)
+            path.append(nxt.node_id)
+            visited.add(nxt.node_id)
+            current = nxt
+        return RouteResult(RouteStatus.OK, path, distance)
+
+class Greedy(GeographicStrategy):
+    # Neighbour closest to the destination (the rule WSN.route uses)
+    name = 'greedy'
+
+    def next_hop(self, current, dest, neighbors):
+        return min(neighbors, key=lambda n: n.distance_to(dest))
+
+class Compass(GeographicStrategy):
+    # Neighbour whose direction deviates least from the straight line to the destination
+    name = 'compass'
+
+    def next_hop(self, current, dest, neighbors):
+        heading = math.atan2(dest.y - current.y, dest.x - current.x)
+        def deviation(n):
+            turn = math.atan2(n.y - current.y, n.x - current.x) - heading
+            return abs((turn + math.pi) % (2 * math.pi) - math.pi)
+        return min(neighbors, key=deviation)
+
+class MostForward(GeographicStrategy):
+    # MFR: neighbour with the largest progress along the line to the destination
+    name = 'mfr'
+
+    def next_hop(self, current, dest, neighbors):
+        dx = dest.x - current.x
+        dy = dest.y - current.y
+        return max(neighbors, key=lambda n: (n.x - current.x) * dx + (n.y - current.y) * dy)
+
+class PlanarGraph:
+    # Gabriel or relative neighbourhood subgraph of the symmetric links, with each node's planar neighbours
+    # sorted by angle so the right-hand rule is a binary search. An edge u-v is dropped only when a witness
+    # w is linked to both u and v, so removing it never disconnects the graph.
+    def __init__(self, wsn, kind='gabriel'):
+        if wsn.sym_neighbors is None:
+            wsn.build_adjacency()
+        self.kind = kind
+        self.version = wsn.topology_version
+        self.angles = {}  # node_id -> sorted angles of the planar edges
+        self.ends = {}  # node_id -> neighbour Node per angle
+        kept = {node.node_id: [] for node in wsn.nodes}
+        for u in wsn.nodes:
+            around_u = set(n.node_id for n in wsn.sym_neighbors[u.node_id])
+            for v in wsn.sym_neighbors[u.node_id]:
+                if v.node_id < u.node_id:
+                    continue
+                if not any(self._witness(u, v, w) for w in wsn.sym_neighbors[v.node_id] if w.node_id in around_u):
+                    kept[u.node_id].append(v)
+                    kept[v.node_id].append(u)
+        for node in wsn.nodes:
+            edges = sorted(((math.atan2(n.y - node.y, n.x - node.x), n) for n in kept[node.node_id]),
+                           key=lambda edge: edge[0])
+            self.angles[node.node_id] = [angle for angle, _ in edges]
+            self.ends[node.node_id] = [n for _, n in edges]
+
+    def _witness(self, u, v, w):
+        d_uv = (u.x - v.x) ** 2 + (u.y - v.y) ** 2
+        d_uw = (u.x - w.x) ** 2 + (u.y - w.y) ** 2
+        d_vw = (v.x - w.x) ** 2 + (v.y - w.y) ** 2
+        if self.kind == 'rng':
+            return max(d_uw, d_vw) < d_uv
+        return d_uw + d_vw < d_uv  # w strictly inside the circle with diameter uv
+
+    def next_ccw(self, node, angle):
+        # First planar edge counter-clockwise from the given direction (the edge back along it comes last)
+        angles = self.angles[node.node_id]
+        if not angles:
+            return None
+        i = bisect_right(angles, angle)
+        return self.ends[node.node_id][i % len(angles)]
+
+# Planar subgraphs per network and kind, rebuilt only when WSN.topology_version moves on
+_planar_cache = weakref.WeakKeyDictionary()
+
+def planar_graph(wsn, kind='gabriel'):
+    graphs = _planar_cache.setdefault(wsn, {})
+    graph = graphs.get(kind)
+    hit = graph is not None and graph.version == wsn.topology_version and wsn.sym_neighbors is not None
+    if wsn.metrics is not None:
+        wsn.metrics.observe_cache('planar', hit)
+    if not hit:
+        graph = graphs[kind] = PlanarGraph(wsn, kind)
+    return graph
+
+def _crossing(a, b, c, d):
+    # Intersection point of segments ab and cd, or None
+    rx, ry = b.x - a.x, b.y - a.y
+    sx, sy = d[0] - c[0], d[1] - c[1]
+    denom = rx * sy - ry * sx
+    if denom == 0:
+        return None
+    qx, qy = c[0] - a.x, c[1] - a.y
+    t = (qx * sy - qy * sx) / denom
+    u = (qx * ry - qy * rx) / denom
+    if 0 < t <= 1 and 0 <= u <= 1:
+        return (a.x + t * rx, a.y + t * ry)
+    return None
+
+class GPSR(GeographicStrategy):
+    # Greedy forwarding over symmetric links, switching to perimeter mode (right-hand rule on the planar
+    # subgraph, with face changes where an edge crosses the line to the destination) at a local maximum and
+    # back to greedy once a node is closer than where perimeter mode started. The destination is declared
+    # unreachable when a face's first edge comes round again. Delivery is guaranteed on unit-disk graphs;
+    # with per-node radio ranges the planarization is best effort.
+    name = 'gpsr'
+
+    def __init__(self, planarization='gabriel'):
+        self.planarization = planarization
+
+    def route(self, wsn, source_id, dest_id, symmetric=True):
+        source = wsn.node_map.get(source_id)
+        dest = wsn.node_map.get(dest_id)
+        if source is None:
+            return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=source_id)
+        if dest is None:
+            return RouteResult(RouteStatus.UNKNOWN_NODE, [], failed_at=dest_id)
+        planar = planar_graph(wsn, self.planarization)
+        target = (dest.x, dest.y)
+
+        path = [source_id]
+        distance = 0.0
+        current = source
+        previous = None
+        entry = None  # Distance to the destination where perimeter mode started; None in greedy mode
+        crossing = None  # Point where the current face was entered on the line towards the destination
+        first_edge = None
+        limit = 2 * sum(len(ends) for ends in planar.ends.values()) + len(wsn.nodes)  # Safety net only
+        while current is not dest:
+            if len(path) > limit:
+                return RouteResult(RouteStatus.LOOP, path, distance, current.node_id)
+            here = current.distance_to(dest)
+            if entry is not None and here < entry:
+                entry = None  # Closer than where the void was hit: back to greedy
+            nxt = None
+            if entry is None:
+                neighbors = wsn.neighbors(current.node_id, True)
+                if not neighbors:
+                    return RouteResult(RouteStatus.NO_NEIGHBORS, path, distance, current.node_id)
+                best = min(neighbors, key=lambda n: n.distance_to(dest))
+                if best.distance_to(dest) < here:
+                    nxt = best
+                else:
+                    # Local maximum: enter perimeter mode on the face crossed by the line to the destination
+                    entry = here
+                    crossing = (current.x, current.y)
+                    start = (current.x, current.y)
+                    nxt = planar.next_ccw(current, math.atan2(dest.y - current.y, dest.x - current.x))
+                    first_edge = None
+            else:
+                nxt = planar.next_ccw(current, math.atan2(previous.y - current.y, previous.x - current.x))
+            if nxt is None:
+                return RouteResult(RouteStatus.NO_NEIGHBORS, path, distance, current.node_id)
+
+            if entry is not None:
+                # Face change: the edge crosses the line to the destination closer than the last crossing
+                for _ in range(len(planar.angles[current.node_id])):
+                    point = _crossing(current, nxt, start, target)
+                    if point is None or math.dist(point, target) >= math.dist(crossing, target):
+                        break
+                    crossing = point
+                    first_edge = None
+                    nxt = planar.next_ccw(current, math.atan2(nxt.y - current.y, nxt.x - current.x))
+                edge = (current.node_id, nxt.node_id)
+                if first_edge is None:
+                    first_edge = edge
+                elif edge == first_edge:
+                    return RouteResult(RouteStatus.UNREACHABLE, path, distance, current.node_id)
+
+            distance += current.distance_to(nxt)
+            path.append(nxt.node_id)
+            previous = current
+            current = nxt
+        return RouteResult(RouteStatus.OK, path, distance)
+
+STRATEGIES = {
+    'greedy': Greedy(),
+    'compass': Compass(),
+    'mfr': MostForward(),
+    'gpsr': GPSR('gabriel'),
+    'gpsr-rng': GPSR('rng'),
+}
+
+def geo_route(wsn, source_id, dest_id, strategy='greedy', symmetric=False):
+    # Route one query with a named strategy from STRATEGIES (GPSR always uses symmetric links)
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown routing strategy {strategy!r}")
+    name = strategy
+    strategy = STRATEGIES[name]
+    start = time.perf_counter()
+    if isinstance(strategy, GPSR):
+        result = strategy.route(wsn, source_id, dest_id)
+    else:
+        result = strategy.route(wsn, source_id, dest_id, symmetric)
+    if wsn.metrics is not None:
+        wsn.metrics.observe_route(name, result, time.perf_counter() - start)
+    return result
+
+def compare(wsn, pairs, policies=('greedy', 'energy-aware'), alpha=1.0, symmetric=False, model=None):
+    # Routing policies (STRATEGIES names or 'energy-aware') over the same queries: per policy the delivered
+    # count, mean hops, mean route energy and the mean over routes of the weakest relay's residual energy
+    routers = {name: (lambda s, d, name=name: geo_route(wsn, s, d, name, symmetric)) for name in policies}
+    if 'energy-aware' in routers:
+        routers['energy-aware'] = lambda s, d: energy_route(wsn, s, d, alpha, symmetric, model)
+    rows = {}
+    for name, router in routers.items():
+        delivered = hops = 0
+        energy = 0.0
+        weakest = []
+        for source_id, dest_id in pairs:
+            result = router(source_id, dest_id)
+            if not result:
+                continue
+            delivered += 1
+            hops += result.hops
+            energy += result.energy if result.energy is not None else route_energy(wsn, result.path, model)
+            if result.hops > 1:
+                weakest.append(min(wsn.node_map[node_id].e for node_id in result.path[1:-1]))
+        rows[name] = {
+            'delivered': delivered,
+            'mean_hops': hops / delivered if delivered else 0.0,
+            'mean_energy': energy / delivered if delivered else 0.0,
+            'weakest_relay': sum(weakest) / len(weakest) if weakest else None,
+        }
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare routing policies on the same random queries")
+    add_network_arguments(parser)
+    parser.add_argument('--policies', nargs='+', choices=sorted(STRATEGIES) + ['energy-aware'],
+                        default=['greedy', 'energy-aware'])
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--alpha', type=float, default=1.0, help="weight of residual energy in the hop cost")
+    parser.add_argument('--symmetric', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    if len(wsn.nodes) < 2:
+        print("Need at least two nodes to route.")
+        return
+
+    rng = random.Random(args.seed)
+    ids = list(wsn.node_map)
+    pairs = [tuple(rng.sample(ids, 2)) for _ in range(args.queries)]
+    for name, row in compare(wsn, pairs, args.policies, args.alpha, args.symmetric).items():
+        weakest = f"{row['weakest_relay']:.1f}" if row['weakest_relay'] is not None else "n/a"
+        print(f"{name}: {row['delivered']}/{len(pairs)} delivered, {row['mean_hops']:.2f} hops, "
+              f"{row['mean_energy']:.3f} energy per route, weakest relay e={weakest} on average")
+
+if __name__ == "__main__":
+    main()
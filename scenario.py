@@ -0,0 +1,98 @@
+import argparse
+import numpy as np
+
+from main import Node
+
+DISTRIBUTIONS = ('uniform', 'hotspots', 'grid', 'corridor')
+
+def generate_columns(n, distribution='uniform', seed=None, width=20, height=20,
+                     r_range=(1, 8), e_range=(1, 100), p_range=(1, 100),
+                     hotspots=3, spread=None, jitter=0.25, corridor_width=None):
+    # Generate all n nodes at once as NumPy columns (x, y, r, e, p) from a seeded generator
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{distribution}', expected one of {', '.join(DISTRIBUTIONS)}")
+    rng = np.random.default_rng(seed)
+
+    if distribution == 'uniform':
+        x = rng.uniform(0, width, n)
+        y = rng.uniform(0, height, n)
+
+    elif distribution == 'hotspots':
+        # Gaussian clouds around randomly placed hot spot centers
+        if spread is None:
+            spread = min(width, height) / 10
+        centers = rng.uniform((0, 0), (width, height), size=(hotspots, 2))
+        which = rng.integers(0, hotspots, n)
+        x = centers[which, 0] + rng.normal(0, spread, n)
+        y = centers[which, 1] + rng.normal(0, spread, n)
+
+    elif distribution == 'grid':
+        # Regular lattice covering the field, each point shifted by up to jitter * spacing
+        cols = max(1, int(np.ceil(np.sqrt(n * width / height))))
+        rows = max(1, int(np.ceil(n / cols)))
+        dx = width / cols
+        dy = height / rows
+        index = np.arange(n)
+        x = (index % cols + 0.5) * dx + rng.uniform(-jitter, jitter, n) * dx
+        y = (index // cols + 0.5) * dy + rng.uniform(-jitter, jitter, n) * dy
+
+    else:
+        # Horizontal band through the middle of the field
+        if corridor_width is None:
+            corridor_width = height / 5
+        x = rng.uniform(0, width, n)
+        y = height / 2 + rng.uniform(-corridor_width / 2, corridor_width / 2, n)
+
+    # Keep every node strictly inside the field so it maps to a valid cluster
+    x = np.clip(x, 0, np.nextafter(width, 0))
+    y = np.clip(y, 0, np.nextafter(height, 0))
+
+    # Same integer attribute ranges as generate_random_node, inclusive on both ends
+    r = rng.integers(r_range[0], r_range[1], n, endpoint=True)
+    e = rng.integers(e_range[0], e_range[1], n, endpoint=True)
+    p = rng.integers(p_range[0], p_range[1], n, endpoint=True)
+    return x, y, r, e, p
+
+def generate_nodes(n, first_id=1, **kwargs):
+    x, y, r, e, p = generate_columns(n, **kwargs)
+    return [Node(first_id + i, *values)
+            for i, values in enumerate(zip(x.tolist(), y.tolist(), r.tolist(), e.tolist(), p.tolist()))]
+
+def populate(wsn, n, **kwargs):
+    # Generate n nodes and add them straight into the network, with IDs after the highest one in use
+    kwargs.setdefault('width', wsn.width)
+    kwargs.setdefault('height', wsn.height)
+    nodes = generate_nodes(n, first_id=max(wsn.node_map, default=0) + 1, **kwargs)
+    wsn.add_nodes(nodes)
+    return nodes
+
+def write_input_file(filename, n, **kwargs):
+    # Write a scenario in the input.txt format read by read_nodes_from_file
+    x, y, r, e, p = generate_columns(n, **kwargs)
+    # Rounding to two decimals must not push a coordinate onto the far edge of the field
+    x = np.minimum(np.round(x, 2), kwargs.get('width', 20) - 0.01)
+    y = np.minimum(np.round(y, 2), kwargs.get('height', 20) - 0.01)
+    with open(filename, 'w') as f:
+        f.write(f"{n}\n")
+        np.savetxt(f, np.column_stack((x, y, r, e, p)), fmt=['%.2f', '%.2f', '%d', '%d', '%d'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a WSN scenario in input.txt format")
+    parser.add_argument('n', type=int, help="number of nodes")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--width', type=float, default=20)
+    parser.add_argument('--height', type=float, default=20)
+    parser.add_argument('--r-range', type=int, nargs=2, default=(1, 8))
+    parser.add_argument('--e-range', type=int, nargs=2, default=(1, 100))
+    parser.add_argument('--p-range', type=int, nargs=2, default=(1, 100))
+    parser.add_argument('--output', default='input.txt')
+    args = parser.parse_args()
+
+    write_input_file(args.output, args.n, distribution=args.distribution, seed=args.seed,
+                     width=args.width, height=args.height,
+                     r_range=args.r_range, e_range=args.e_range, p_range=args.p_range)
+    print(f"{args.n} nodes ({args.distribution}) written to {args.output}")
+
+if __name__ == "__main__":
+    main()
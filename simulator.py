@@ -0,0 +1,200 @@
+import argparse
+import heapq
+import itertools
+import random
+
+from main import RouteStatus, add_network_arguments, build_network
+
+def percentile(sorted_values, q):
+    # Linearly interpolated q-th percentile (0-100) of an already sorted sequence
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+class SimulationReport:
+    def __init__(self, injected, delivered, dropped, latencies, delivered_bits, duration, queueing_delay, transmissions):
+        self.injected = injected
+        self.delivered = delivered
+        self.dropped = dropped  # RouteStatus -> number of packets that had no route
+        self.latencies = latencies  # Sorted end-to-end latencies of delivered packets, in seconds
+        self.duration = duration  # From the first injection to the last delivery
+        self.throughput = delivered_bits / duration if duration > 0 else 0.0  # Delivered bits per second
+        self.queueing_delay = queueing_delay  # node_id -> total time packets waited for that node's radio
+        self.transmissions = transmissions  # node_id -> packets transmitted by that node
+
+    def latency(self, q):
+        return percentile(self.latencies, q)
+
+    def summary(self):
+        lines = [f"Packets injected: {self.injected}, delivered: {self.delivered}, "
+                 f"dropped: {sum(self.dropped.values())}"]
+        for status, count in self.dropped.items():
+            lines.append(f"  {status.value}: {count}")
+        if self.latencies:
+            mean = sum(self.latencies) / len(self.latencies)
+            lines.append(f"Latency (ms): mean {mean * 1e3:.3f}, p50 {self.latency(50) * 1e3:.3f}, "
+                         f"p90 {self.latency(90) * 1e3:.3f}, p99 {self.latency(99) * 1e3:.3f}, "
+                         f"max {self.latencies[-1] * 1e3:.3f}")
+        lines.append(f"Throughput: {self.throughput / 1e3:.2f} kbit/s over {self.duration:.3f} s")
+        busiest = sorted(self.queueing_delay.items(), key=lambda item: item[1], reverse=True)[:5]
+        if busiest and busiest[0][1] > 0:
+            lines.append("Most congested nodes (total queueing delay, ms): "
+                         + ', '.join(f"{node_id}: {delay * 1e3:.2f}" for node_id, delay in busiest if delay > 0))
+        return '\n'.join(lines)
+
+class Simulator:
+    # Discrete-event packet simulator: every node owns one radio that sends one packet at a time (FIFO),
+    # so packets wait at busy relays and clusterheads before each hop.
+    def __init__(self, wsn, bitrate=250_000, packet_bits=1024, propagation_speed=3e8,
+                 processing_delay=0.0, via_clusterhead=False, symmetric=False):
+        self.wsn = wsn
+        self.tx_time = packet_bits / bitrate  # Seconds to put one packet on the air
+        self.packet_bits = packet_bits
+        self.propagation_speed = propagation_speed
+        self.processing_delay = processing_delay  # Per-hop delay before a relay may forward
+        self.via_clusterhead = via_clusterhead  # Send every packet through the source's clusterhead first
+        self.symmetric = symmetric
+        self._routes = {}  # (source_id, dest_id) -> (path, per-hop propagation delays) or RouteStatus
+        self._events = []
+        self._seq = itertools.count()
+        self._paths = []  # packet -> path of node IDs
+        self._hop_delays = []  # packet -> per-hop propagation delays
+        self._inject_times = []
+        self._dropped = {}
+        # Run state lives on the simulator so run(until=...) can be resumed by a later call
+        self._busy_until = {}  # node_id -> time its radio becomes free
+        self._queueing_delay = {}
+        self._transmissions = {}
+        self._latencies = []
+        self._last_delivery = 0.0
+
+    def _route(self, source_id, dest_id):
+        key = (source_id, dest_id)
+        cached = self._routes.get(key)
+        if cached is not None:
+            return cached
+
+        legs = [(source_id, dest_id)]
+        if self.via_clusterhead:
+            source = self.wsn.node_map.get(source_id)
+            head = source.cluster.clusterhead if source is not None and source.cluster else None
+            if head is not None and head.node_id not in (source_id, dest_id):
+                legs = [(source_id, head.node_id), (head.node_id, dest_id)]
+
+        path = [source_id]
+        for a, b in legs:
+            result = self.wsn.route(a, b, self.symmetric)
+            if not result:
+                self._routes[key] = result.status
+                return result.status
+            path.extend(result.path[1:])
+
+        node_map = self.wsn.node_map
+        delays = [node_map[a].distance_to(node_map[b]) / self.propagation_speed for a, b in zip(path, path[1:])]
+        self._routes[key] = cached = (path, delays)
+        return cached
+
+    def inject(self, source_id, dest_id, time=0.0):
+        # Schedule a packet from source to destination; returns False if the routing layer has no path
+        route = self._route(source_id, dest_id)
+        if isinstance(route, RouteStatus):
+            self._dropped[route] = self._dropped.get(route, 0) + 1
+            return False
+        packet = len(self._paths)
+        self._paths.append(route[0])
+        self._hop_delays.append(route[1])
+        self._inject_times.append(time)
+        heapq.heappush(self._events, (time, next(self._seq), packet, 0))
+        return True
+
+    def inject_poisson(self, count, rate, seed=None, pairs=None):
+        # Inject count packets with exponential inter-arrival times (rate packets/s network-wide)
+        # between random distinct node pairs, or between the given (source, dest) pairs
+        rng = random.Random(seed)
+        ids = list(self.wsn.node_map)
+        if not pairs and len(ids) < 2:
+            return
+        time = 0.0
+        for _ in range(count):
+            time += rng.expovariate(rate)
+            if pairs:
+                source_id, dest_id = rng.choice(pairs)
+            else:
+                source_id, dest_id = rng.sample(ids, 2)
+            self.inject(source_id, dest_id, time)
+
+    def run(self, until=None):
+        events = self._events
+        paths = self._paths
+        hop_delays = self._hop_delays
+        inject_times = self._inject_times
+        seq = self._seq
+        tx_time = self.tx_time
+        processing_delay = self.processing_delay
+        pop = heapq.heappop
+        push = heapq.heappush
+
+        busy_until = self._busy_until
+        queueing_delay = self._queueing_delay
+        transmissions = self._transmissions
+        latencies = self._latencies
+        last_delivery = self._last_delivery
+
+        while events:
+            if until is not None and events[0][0] > until:
+                break
+            time, _, packet, hop = pop(events)
+            path = paths[packet]
+            if hop == len(path) - 1:
+                latencies.append(time - inject_times[packet])
+                last_delivery = time
+                continue
+
+            # Events are handled in time order, so reserving the radio at arrival keeps FIFO order per node
+            node_id = path[hop]
+            ready = time + processing_delay if hop else time
+            start = busy_until.get(node_id, 0.0)
+            if start < ready:
+                start = ready
+            else:
+                queueing_delay[node_id] = queueing_delay.get(node_id, 0.0) + start - ready
+            busy_until[node_id] = start + tx_time
+            transmissions[node_id] = transmissions.get(node_id, 0) + 1
+            push(events, (start + tx_time + hop_delays[packet][hop], next(seq), packet, hop + 1))
+
+        self._last_delivery = last_delivery
+        latencies = sorted(latencies)
+        first_injection = min(inject_times) if inject_times else 0.0
+        return SimulationReport(
+            injected=len(paths) + sum(self._dropped.values()),
+            delivered=len(latencies),
+            dropped=dict(self._dropped),
+            latencies=latencies,
+            delivered_bits=len(latencies) * self.packet_bits,
+            duration=max(last_delivery - first_injection, 0.0),
+            queueing_delay=dict(queueing_delay),
+            transmissions=dict(transmissions),
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate packet latency and throughput over the WSN")
+    add_network_arguments(parser)
+    parser.add_argument('--packets', type=int, default=10000)
+    parser.add_argument('--rate', type=float, default=100.0, help="network-wide packets per second")
+    parser.add_argument('--bitrate', type=float, default=250_000)
+    parser.add_argument('--packet-bits', type=int, default=1024)
+    parser.add_argument('--via-clusterhead', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+
+    sim = Simulator(wsn, bitrate=args.bitrate, packet_bits=args.packet_bits, via_clusterhead=args.via_clusterhead)
+    sim.inject_poisson(args.packets, args.rate, seed=args.seed)
+    print(sim.run().summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import heapq
+import math
+import random
+import time
+from collections import deque
+
+import parallel
+from main import RouteStatus, add_network_arguments, build_network
+from parallel import ParallelRouter
+from simulator import percentile
+
+def _stretch_rows(batch):
+    # batch: (source row, [dest rows]). Per source, one BFS gives the fewest hops and one Dijkstra the shortest
+    # Euclidean length to every node; each pair is then routed greedily. Returns per pair
+    # (greedy status code, greedy hops, greedy length, optimal hops, optimal length), optimal None if unreachable.
+    worker = parallel._worker  # Zero-copy memoryviews over the shared topology
+    x = worker['x']
+    y = worker['y']
+    indptr = worker['indptr']
+    indices = worker['indices']
+    results = []
+    for source, dests in batch:
+        hops = {source: 0}
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for v in indices[indptr[u]:indptr[u + 1]]:
+                if v not in hops:
+                    hops[v] = hops[u] + 1
+                    queue.append(v)
+
+        length = {}
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in length:
+                continue
+            length[u] = d
+            for v in indices[indptr[u]:indptr[u + 1]]:
+                if v not in length:
+                    heapq.heappush(heap, (d + math.hypot(x[u] - x[v], y[u] - y[v]), v))
+
+        greedy = parallel._route_rows([(source, dest) for dest in dests])
+        for dest, (status, path, distance, _) in zip(dests, greedy):
+            results.append((status, len(path) - 1, distance, hops.get(dest), length.get(dest)))
+    return results
+
+class StretchReport:
+    def __init__(self, pairs, results):
+        self.pairs = pairs  # (source_id, dest_id) in evaluation order
+        self.results = results  # Per pair: (greedy RouteStatus, greedy hops, greedy length, optimal hops, optimal length)
+        reachable = [r for r in results if r[3] is not None]
+        delivered = [r for r in reachable if r[0] == RouteStatus.OK]
+        self.unreachable = len(results) - len(reachable)  # No path at all; greedy cannot be blamed
+        self.reachable = len(reachable)
+        self.failures = {}  # Status -> greedy failures among reachable pairs
+        for status, *_ in reachable:
+            if status != RouteStatus.OK:
+                self.failures[status] = self.failures.get(status, 0) + 1
+        # Stretch over delivered pairs; pairs with source == dest have no stretch
+        self.hop_stretch = sorted(r[1] / r[3] for r in delivered if r[3])
+        self.length_stretch = sorted(r[2] / r[4] for r in delivered if r[4])
+
+    @property
+    def failure_rate(self):
+        return sum(self.failures.values()) / self.reachable if self.reachable else 0.0
+
+    def summary(self):
+        lines = [f"{len(self.results)} pairs: {self.reachable} reachable, {self.unreachable} without any path",
+                 f"Greedy failure rate on reachable pairs: {self.failure_rate * 100:.1f}%"]
+        for status, count in sorted(self.failures.items(), key=lambda item: -item[1]):
+            lines.append(f"  {status.value}: {count}")
+        for name, values in (("Hop stretch", self.hop_stretch), ("Length stretch", self.length_stretch)):
+            if not values:
+                continue
+            optimal = sum(1 for v in values if v <= 1 + 1e-9)
+            lines.append(f"{name}: mean {sum(values) / len(values):.3f}, "
+                         f"p50 {percentile(values, 50):.3f}, p90 {percentile(values, 90):.3f}, "
+                         f"p99 {percentile(values, 99):.3f}, max {values[-1]:.3f} "
+                         f"({optimal / len(values) * 100:.1f}% optimal)")
+        return '\n'.join(lines)
+
+def sample_pairs(wsn, sources=100, per_source=10, seed=None):
+    # Distinct (source_id, dest_id) pairs, grouped by source so each source's searches are shared
+    rng = random.Random(seed)
+    ids = list(wsn.node_map)
+    pairs = []
+    for source_id in rng.sample(ids, min(sources, len(ids))):
+        others = [node_id for node_id in ids if node_id != source_id]
+        pairs.extend((source_id, dest_id) for dest_id in rng.sample(others, min(per_source, len(others))))
+    return pairs
+
+def evaluate_stretch(wsn, pairs, workers=None, symmetric=False, router=None):
+    # Greedy versus optimal routes for (source_id, dest_id) pairs. Sources are spread over the workers of a
+    # ParallelRouter (pass one in to reuse its pool and shared topology).
+    own = router is None
+    if own:
+        router = ParallelRouter(wsn, workers, symmetric)
+    try:
+        index = router.topology.index
+        order = []
+        by_source = {}
+        for source_id, dest_id in pairs:
+            if source_id not in index or dest_id not in index:
+                raise ValueError(f"Node {source_id if source_id not in index else dest_id} not found in the network")
+            if source_id not in by_source:
+                by_source[source_id] = []
+                order.append(source_id)
+            by_source[source_id].append(dest_id)
+        batches = [(index[source_id], [index[dest_id] for dest_id in by_source[source_id]]) for source_id in order]
+        chunk_size = max(1, -(-len(batches) // (router.workers * 4)))
+        chunks = [batches[i:i + chunk_size] for i in range(0, len(batches), chunk_size)]
+
+        grouped = [(source_id, dest_id) for source_id in order for dest_id in by_source[source_id]]
+        results = []
+        for chunk in router.imap(_stretch_rows, chunks):
+            for status, *rest in chunk:
+                results.append((parallel._STATUSES[status], *rest))
+    finally:
+        if own:
+            router.close()
+    return StretchReport(grouped, results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare greedy routes with optimal ones over sampled pairs")
+    add_network_arguments(parser)
+    parser.add_argument('--sources', type=int, default=100)
+    parser.add_argument('--per-source', type=int, default=10, help="destinations sampled per source")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--symmetric', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    wsn = build_network(args.input, args.width, args.height, args.cell)
+    if len(wsn.nodes) < 2:
+        print("Need at least two nodes.")
+        return
+    pairs = sample_pairs(wsn, args.sources, args.per_source, args.seed)
+    start = time.perf_counter()
+    report = evaluate_stretch(wsn, pairs, args.workers, args.symmetric)
+    elapsed = time.perf_counter() - start
+    print(report.summary())
+    print(f"Evaluated in {elapsed:.3f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+
+from main import Node, WSN
+from replay import replay
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.wsn = WSN(20, 20, 5)
+        self.wsn.add_nodes([Node(1, 1, 1, 3, 50, 50), Node(2, 3, 1, 3, 50, 50)])
+        self.wsn.elect_clusterheads()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def run_lines(self, lines):
+        requests = os.path.join(self.dir.name, 'requests.jsonl')
+        output = os.path.join(self.dir.name, 'results.jsonl')
+        with open(requests, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        report = replay(self.wsn, requests, output)
+        with open(output, encoding='utf-8') as f:
+            return report, [json.loads(line) for line in f]
+
+    def test_non_object_records_are_errors(self):
+        report, results = self.run_lines(['null', '[1, 2]', '"abc"', '{"source": 1, "dest": 2}'])
+        self.assertEqual(report.errors, 3)
+        self.assertEqual(report.queries, 1)
+        self.assertEqual([('error' in r, r['line']) for r in results], [(True, 1), (True, 2), (True, 3), (False, 4)])
+        self.assertEqual(results[3]['status'], 'ok')
+
+    def test_add_outside_field_is_an_error(self):
+        report, results = self.run_lines(['{"op": "add", "id": 3, "x": 25, "y": 1, "r": 3, "e": 50, "p": 50}',
+                                          '{"op": "add", "id": 4, "x": 5, "y": 1, "r": 3, "e": 50, "p": 50}'])
+        self.assertEqual((report.errors, report.events), (1, 1))
+        self.assertIn('outside the field', results[0]['error'])
+        self.assertNotIn(3, self.wsn.node_map)
+        self.assertIsNotNone(self.wsn.node_map[4].cluster)
+
+if __name__ == "__main__":
+    unittest.main()
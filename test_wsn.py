@@ -0,0 +1,188 @@
+import io
+import os
+import random
+import struct
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import main
+from main import SNAPSHOT_HEADER, Node, RouteStatus, WSN, load_or_build
+
+def random_network(n, seed, lattice=False, width=20, height=20):
+    # Lattice coordinates put many neighbours at exactly the same distance, which exercises tie-breaks
+    rng = random.Random(seed)
+    wsn = WSN(width, height, 5)
+    for i in range(n):
+        if lattice:
+            x, y = rng.randrange(width), rng.randrange(height)
+        else:
+            x, y = rng.uniform(0, width), rng.uniform(0, height)
+        wsn.add_node(Node(i + 1, x, y, rng.choice([1, 2, 3, 4]), rng.randint(1, 100), rng.randint(1, 100)))
+    return wsn
+
+def full_scan_route(wsn, source_id, dest_id, symmetric=False):
+    # The original routing loop: neighbours found by scanning every node, closest to the destination first
+    source = wsn.node_map[source_id]
+    dest = wsn.node_map[dest_id]
+    path = [source]
+    current = source
+    while current is not dest:
+        neighbors = [n for n in wsn.nodes if n is not current and current.distance_to(n) <= current.r
+                     and (not symmetric or n.distance_to(current) <= n.r)]
+        if not neighbors:
+            return RouteStatus.NO_NEIGHBORS, [n.node_id for n in path]
+        next_hop = min(neighbors, key=lambda n: n.distance_to(dest))
+        if next_hop in path:
+            return RouteStatus.LOOP, [n.node_id for n in path]
+        path.append(next_hop)
+        current = next_hop
+    return RouteStatus.OK, [n.node_id for n in path]
+
+def adjacency(wsn):
+    return [{node_id: [n.node_id for n in nodes] for node_id, nodes in index.items()}
+            for index in (wsn.out_neighbors, wsn.in_neighbors, wsn.sym_neighbors)]
+
+class RouteTest(unittest.TestCase):
+    def test_matches_full_scan(self):
+        for seed, lattice in ((1, False), (2, True), (3, True)):
+            wsn = random_network(150, seed, lattice)
+            rng = random.Random(seed)
+            for _ in range(300):
+                source_id, dest_id = rng.choice(list(wsn.node_map)), rng.choice(list(wsn.node_map))
+                for symmetric in (False, True):
+                    result = wsn.route(source_id, dest_id, symmetric)
+                    status, path = full_scan_route(wsn, source_id, dest_id, symmetric)
+                    self.assertEqual((result.status, result.path), (status, path))
+
+    def test_unknown_node(self):
+        wsn = random_network(5, 1)
+        result = wsn.route(1, 99)
+        self.assertIs(result.status, RouteStatus.UNKNOWN_NODE)
+        self.assertEqual(result.failed_at, 99)
+        self.assertFalse(result)
+
+class IncrementalAdjacencyTest(unittest.TestCase):
+    def assert_fresh(self, wsn):
+        patched = adjacency(wsn)
+        wsn.build_adjacency()
+        self.assertEqual(patched, adjacency(wsn))
+
+    def test_add_remove_move(self):
+        for seed, lattice in ((4, False), (5, True)):
+            wsn = random_network(120, seed, lattice)
+            wsn.build_adjacency()
+            rng = random.Random(seed)
+            next_id = 1000
+            for step in range(60):
+                op = step % 3
+                if op == 0:
+                    # Range 6 is wider than the grid cells built from the initial nodes
+                    wsn.add_node(Node(next_id, rng.uniform(0, 20), rng.uniform(0, 20), rng.choice([1, 2, 3, 4, 6]), 50, 50))
+                    next_id += 1
+                elif op == 1:
+                    wsn.remove_node(rng.choice(list(wsn.node_map)))
+                else:
+                    wsn.move_node(rng.choice(list(wsn.node_map)), rng.uniform(0, 19.9), rng.uniform(0, 19.9))
+                self.assert_fresh(wsn)
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.input = os.path.join(self.dir.name, 'input.txt')
+        self.snapshot = os.path.join(self.dir.name, 'network.snapshot')
+        with open(self.input, 'w', encoding='utf-8') as f:
+            f.write("2\n1 1 3 40 30\n2 2 3 50 60\n")
+
+    def state(self, wsn):
+        return ([(n.node_id, n.x, n.y, n.r, n.e, n.p) for n in wsn.nodes],
+                [([n.node_id for n in c.nodes], c.clusterhead.node_id if c.clusterhead else None)
+                 for c in wsn.clusters],
+                adjacency(wsn) if wsn.out_neighbors is not None else None)
+
+    def test_round_trip_keeps_member_order(self):
+        wsn = random_network(200, 6)
+        wsn.elect_clusterheads()
+        wsn.build_adjacency()
+        rng = random.Random(6)
+        for _ in range(30):  # Moves and removals leave cluster member order different from wsn.nodes order
+            wsn.move_node(rng.choice(list(wsn.node_map)), rng.uniform(0, 19.9), rng.uniform(0, 19.9))
+        for node_id in rng.sample(list(wsn.node_map), 10):
+            wsn.remove_node(node_id)
+        for with_adjacency in (True, False):
+            if not with_adjacency:
+                wsn.invalidate_adjacency()
+            wsn.save_snapshot(self.snapshot, self.input)
+            loaded = WSN.load_snapshot(self.snapshot, self.input)
+            self.assertEqual(self.state(wsn), self.state(loaded))
+
+    def test_incremental_updates_after_load(self):
+        wsn = random_network(100, 8)
+        wsn.build_adjacency()
+        wsn.save_snapshot(self.snapshot, self.input)
+        loaded = WSN.load_snapshot(self.snapshot, self.input)
+        loaded.move_node(5, 10.5, 10.5)
+        loaded.add_node(Node(500, 3, 3, 2, 50, 50))
+        patched = adjacency(loaded)
+        loaded.build_adjacency()
+        self.assertEqual(patched, adjacency(loaded))
+
+    def test_corrupt_index_is_a_cache_miss(self):
+        wsn = random_network(30, 9)
+        wsn.save_snapshot(self.snapshot, self.input)
+        # First cluster member index: after the header, six 8-byte node columns and the member offsets
+        offset = SNAPSHOT_HEADER.size + 6 * 8 * len(wsn.nodes) + 4 * (len(wsn.clusters) + 1)
+        with open(self.snapshot, 'r+b') as f:
+            f.seek(offset)
+            f.write(struct.pack('<I', 999))
+        with self.assertRaises(ValueError):
+            WSN.load_snapshot(self.snapshot, self.input)
+        rebuilt = load_or_build(self.input, self.snapshot)
+        self.assertEqual([n.node_id for n in rebuilt.nodes], [1, 2])
+
+    def test_stale_input_returns_none(self):
+        wsn = random_network(20, 7)
+        wsn.save_snapshot(self.snapshot, self.input)
+        self.assertIsNotNone(WSN.load_snapshot(self.snapshot, self.input))
+        with open(self.input, 'a', encoding='utf-8') as f:
+            f.write("\n")
+        self.assertIsNone(WSN.load_snapshot(self.snapshot, self.input))
+
+class AddNodesTest(unittest.TestCase):
+    def nodes(self, seed):
+        # Some nodes on cell edges and some outside the field
+        rng = random.Random(seed)
+        coords = [(rng.uniform(-2, 22), rng.uniform(-2, 22)) for _ in range(300)]
+        coords += [(rng.randrange(0, 21, 5), rng.randrange(0, 21, 5)) for _ in range(40)]
+        return [Node(i + 1, x, y, 2, 50, 50) for i, (x, y) in enumerate(coords)]
+
+    def membership(self, add):
+        wsn = WSN(20, 20, 5)
+        with redirect_stdout(io.StringIO()) as out:
+            add(wsn, self.nodes(10))
+        return ([n.node_id for n in wsn.nodes], [[n.node_id for n in c.nodes] for c in wsn.clusters],
+                [c.version > 0 for c in wsn.clusters], out.getvalue())  # Bulk adds bump each version once
+
+    def one_by_one(self, wsn, nodes):
+        for node in nodes:
+            wsn.add_node(node)
+
+    def test_pure_python_path(self):
+        with mock.patch.dict(sys.modules, {'numpy': None}), mock.patch.object(main, 'VECTORIZE_MIN_NODES', 0):
+            bulk = self.membership(WSN.add_nodes)
+        self.assertEqual(bulk, self.membership(self.one_by_one))
+
+    def test_numpy_path(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        with mock.patch.object(main, 'VECTORIZE_MIN_NODES', 1):
+            bulk = self.membership(WSN.add_nodes)
+        self.assertEqual(bulk, self.membership(self.one_by_one))
+
+if __name__ == "__main__":
+    unittest.main()